@@ -3,12 +3,13 @@ from qiskit.quantum_info import Statevector
 from qiskit import QuantumCircuit
 from symmer import process, QuantumState, PauliwordOp
 from symmer.operators.utils import (
-    symplectic_to_string, safe_PauliwordOp_to_dict, safe_QuantumState_to_dict
+    symplectic_to_string, safe_PauliwordOp_to_dict, safe_QuantumState_to_dict,
+    mul_symplectic, expval_symplectic
 )
 from symmer.evolution import PauliwordOp_to_QuantumCircuit, get_CNOT_connectivity_graph, topology_match_score
 from networkx.algorithms.cycles import cycle_basis
 from scipy.optimize import minimize
-from copy import deepcopy
+from scipy.sparse import csr_matrix, issparse
 import numpy as np
 from typing import *
 
@@ -24,10 +25,14 @@ class VQE_Driver:
     Attributes:
         expectation_eval (str): expectation value method. Its default value is 'symbolic_direct'.
         verbose (bool): If True, prints out useful information during computation. By default it is set to 'True'.
+        serial_qubit_threshold (int): Below this number of qubits gradients are evaluated serially, since each 
+            expectation value is cheaper than dispatching it to a worker. Its default value is 10.
     """
     expectation_eval = 'symbolic_direct'
     # prints out useful information during computation:
     verbose = True
+    # small problems are evaluated serially to avoid the parallelization overhead:
+    serial_qubit_threshold = 10
        
     def __init__(self,
         observable: PauliwordOp,
@@ -44,6 +49,8 @@ class VQE_Driver:
         """
         self.observable = observable
         self.ref_state = ref_state
+        self._generator_circuit = None
+        self._generator_matrices = None
         # observables must have real coefficients over the Pauli group:
         assert np.all(self.observable.coeff_vec.imag == 0), 'Observable not Hermitian'
         
@@ -52,6 +59,32 @@ class VQE_Driver:
         else:
             self.circuit = ansatz_circuit
 
+    @cached_property
+    def _obs_sparse(self):
+        """ 
+        Sparse matrix form of the observable, cached since it is fixed for the
+        lifetime of the driver but required on every expectation value evaluation.
+        """
+        return self.observable.to_sparse_matrix.tocsr()
+
+    @cached_property
+    def _obs_dense(self):
+        """ 
+        Dense matrix form of the observable, only built if the dense_array method is used.
+        """
+        return self._obs_sparse.toarray()
+
+    @cached_property
+    def _ref_vector(self):
+        """ 
+        Dense vector form of the reference state, defaulting to the all zero state.
+        """
+        if self.ref_state is None:
+            ref_state = QuantumState.zero(self.observable.n_qubits)
+        else:
+            ref_state = self.ref_state
+        return ref_state.to_sparse_matrix.toarray().reshape(-1)
+
     def prepare_for_evolution(self, excitation_ops: PauliwordOp) -> None:
         """ 
         Save the excitation generators and construct corresponding ansatz circuit.
@@ -65,6 +98,73 @@ class VQE_Driver:
         self.circuit = PauliwordOp_to_QuantumCircuit(
                 PwordOp=self.excitation_generators, ref_state=self.ref_state, bind_params=False
         )
+        # the generator matrices are tied to this circuit and only built once a statevector is required
+        self._generator_circuit = self.circuit
+        self._generator_matrices = None
+        # the individual generator terms are likewise fixed for the observable_rotation method
+        self._generator_list = list(self.excitation_generators)
+
+    @property
+    def _generator_ansatz(self) -> bool:
+        """ 
+        Whether the current circuit is the one constructed from the excitation generators, in
+        which case the ansatz may be prepared and differentiated from the generators directly.
+        """
+        return self._generator_circuit is not None and self.circuit is self._generator_circuit
+
+    def _get_generator_matrices(self) -> List[csr_matrix]:
+        """ 
+        Memoize the action of each generator so the ansatz state may be prepared directly
+        on each evaluation, rather than rebinding the circuit and simulating it gate-by-gate;
+        identity terms carry no circuit parameter and are dropped as in the circuit construction.
+        """
+        if self._generator_matrices is None:
+            non_identity = self.excitation_generators[np.any(self.excitation_generators.symp_matrix, axis=1)]
+            self._generator_matrices = [P.to_sparse_matrix for P in non_identity]
+        return self._generator_matrices
+
+    def _evolve_reference(self, x: np.array) -> np.array:
+        """ 
+        Prepare the ansatz state e^{iθ_N P_N}...e^{iθ_1 P_1}|ref> from the memoized generators.
+
+        Args:
+            x (np.array): Parameter vector
+
+        Returns:
+            Statevector (np.array) equivalent to simulating the bound ansatz circuit.
+        """
+        state = self._ref_vector
+        for P_matrix, angle in zip(self._get_generator_matrices(), x):
+            state = np.cos(angle)*state + 1j*np.sin(angle)*(P_matrix @ state)
+        return state
+
+    def _adjoint_gradient(self, x: np.array) -> Tuple[float, np.array]:
+        """ 
+        Adjoint differentiation of the ansatz e^{iθ_N P_N}...e^{iθ_1 P_1}|ref>; a single forward
+        pass prepares |ψ> and H|ψ>, which are then unwound one generator at a time, giving
+        the partial derivatives ∂_k<H> = -2 Im<λ_k|P_k|φ_k> at the cost of O(1) simulations 
+        rather than the 2n required by the parameter shift rule.
+
+        Args:
+            x (np.array): Parameter vector
+
+        Returns:
+            Energy (float), a by-product of the forward pass, and ansatz parameter gradient (np.array)
+        """
+        phi = self._evolve_reference(x)
+        lam = self._obs_sparse @ phi
+        energy = np.vdot(phi, lam).real
+        generator_matrices = self._get_generator_matrices()
+        gradient = np.zeros(len(generator_matrices))
+        for index in range(len(generator_matrices)-1, -1, -1):
+            P_matrix = generator_matrices[index]
+            P_phi = P_matrix @ phi
+            gradient[index] = -2*np.vdot(lam, P_phi).imag
+            # apply the inverse rotation e^{-iθP} = cos(θ) - i sin(θ) P to both states
+            cos, sin = np.cos(x[index]), np.sin(x[index])
+            phi = cos*phi - 1j*sin*P_phi
+            lam = cos*lam - 1j*sin*(P_matrix @ lam)
+        return energy, gradient
 
     def get_state(self, 
             evolution_obj: Union[QuantumCircuit, PauliwordOp], 
@@ -81,15 +181,22 @@ class VQE_Driver:
             - Rotations of the form [(generator, angle)] for the observable_rotation expectation_eval method.
         """
         if self.expectation_eval == 'observable_rotation':
-            return list(zip(evolution_obj, -2*x))
+            # the last generator in the circuit is the first to act upon the observable
+            if evolution_obj is self.excitation_generators:
+                evolution_obj = self._generator_list
+            return list(zip(evolution_obj, -2*x))[::-1]
         else:
-            state = Statevector(evolution_obj.bind_parameters(x))
+            if evolution_obj is self.circuit and self._generator_ansatz:
+                statevector = self._evolve_reference(x)
+            else:
+                statevector = Statevector.from_instruction(evolution_obj.assign_parameters(x)).data
+            statevector = statevector.reshape([-1,1])
             if self.expectation_eval == 'dense_array':
-                return state.to_matrix().reshape([-1,1])
+                return statevector
             elif self.expectation_eval == 'sparse_array':
-                return state.to_spmatrix().reshape([-1,1])
+                return csr_matrix(statevector)
             elif self.expectation_eval.find('symbolic') != -1:
-                return QuantumState.from_array(state.to_matrix().reshape([-1,1]))
+                return QuantumState.from_array(statevector)
         
     def _f(self, 
            observable: PauliwordOp, 
@@ -110,12 +217,26 @@ class VQE_Driver:
             Expectation Value (float)
         """
         if self.expectation_eval == 'dense_array':
-            return (state.conjugate().T @ observable.to_sparse_matrix.toarray() @ state)[0,0].real
+            if observable is self.observable:
+                obs_matrix = self._obs_dense
+            else:
+                obs_matrix = observable.to_sparse_matrix.toarray()
+            return (state.conjugate().T @ obs_matrix @ state)[0,0].real
         elif self.expectation_eval == 'sparse_array':
-            return (state.conjugate().T @ observable.to_sparse_matrix @ state)[0,0].real
+            if observable is self.observable:
+                obs_matrix = self._obs_sparse
+            else:
+                obs_matrix = observable.to_sparse_matrix
+            return (state.conjugate().T @ obs_matrix @ state)[0,0].real
         elif self.expectation_eval == 'symbolic_projector':
             return observable.expval(state).real
         elif self.expectation_eval == 'symbolic_direct':
+            if observable.n_qubits < 64:
+                # compiled sandwich product, avoiding the intermediate operator-state products
+                return expval_symplectic(
+                    state.state_matrix, state.state_op.coeff_vec, 
+                    observable.symp_matrix, observable.coeff_vec
+                ).real
             return (state.dagger * observable * state).real   
         elif self.expectation_eval == 'observable_rotation':
             return (self.ref_state.dagger * observable.perform_rotations(state) * self.ref_state).real
@@ -162,64 +283,94 @@ class VQE_Driver:
         Returns:
             Ansatz parameter gradient (np.array)
         """
-        if self.expectation_eval.find('projector') == -1:
-            @process.parallelize
-            def f(index, param):
-                return self.partial_derivative(param,index)
-            grad_vec = f(range(self.circuit.num_parameters), x)
+        if self._generator_ansatz and self.expectation_eval != 'observable_rotation':
+            # the ansatz is built from Pauli generators, so we may differentiate it directly
+            return self._adjoint_gradient(x)[1]
+
+        n_params = self.circuit.num_parameters
+        # build all 2n shifted parameter vectors in one batch, upper shifts then lower shifts
+        shifts = np.eye(n_params)*np.pi/4
+        x_shifted = np.vstack([x + shifts, x - shifts])
 
+        energies = np.empty(2*n_params, dtype=np.float64)
+        if (
+                self.expectation_eval in ['symbolic_projector', 'observable_rotation'] or
+                self.observable.n_qubits < self.serial_qubit_threshold
+            ):
+            # symbolic_projector is already multiprocessed and observable_rotation (or any 
+            # small problem) is cheap enough that the parallelization overhead is not worthwhile
+            for index, x_shift in enumerate(x_shifted):
+                energies[index] = self.f(x_shift)
         else:
-            grad_vec = [self.partial_derivative(x, i) for i in range(self.circuit.num_parameters)]
+            @process.parallelize
+            def f(x_shift, driver):
+                return driver.f(x_shift)
+            energies[:] = f(x_shifted, self)
         
-        return np.asarray(grad_vec)
+        return energies[:n_params] - energies[n_params:]
     
-    def run(self, x0:np.array=None, **kwargs):
+    def f_and_gradient(self, x: np.array) -> Tuple[float, np.array]:
+        """ 
+        Get the energy and ansatz parameter gradient together; where adjoint differentiation
+        applies the energy comes from the same forward pass, saving a simulation per step.
+
+        Args:
+            x (np.array): Parameter vector
+        
+        Returns:
+            Energy (float) and ansatz parameter gradient (np.array)
+        """
+        if self._generator_ansatz and self.expectation_eval != 'observable_rotation':
+            return self._adjoint_gradient(x)
+        return self.f(x), self.gradient(x)
+
+    def run(self, x0:np.array=None, init_scale:float=0, **kwargs):
         """ 
         Run the VQE routine.
         
         Args:
-            x0 (np.array): Parameter vector
+            x0 (np.array): Parameter vector. By default, it's the zero vector.
+            init_scale (float): If nonzero, the default initial parameters are instead drawn uniformly from [0, init_scale). By default, it's set to 0.
         """
         if x0 is None:
-            x0 = np.random.random(self.circuit.num_parameters)
+            if init_scale == 0:
+                x0 = np.zeros(self.circuit.num_parameters)
+            else:
+                x0 = init_scale*np.random.random(self.circuit.num_parameters)
         
         vqe_history = {'params':{}, 'energy':{}, 'gradient':{}}
 
-        # set up a counter to keep track of optimization steps this is important 
-        # as some optimizers do not compute gradients at each optimization step and 
-        # therefore must be labeled to match with the correct iteration later on
-        global counter
-        counter = -1
-        def get_counter(increment=True):
-            global counter
-            if increment:
-                counter += 1
-            return counter
-
-        # wrap VQE_Driver.f() for the optimizer and store the interim values
-        def fun(x):    
-            counter = get_counter(increment=True)
+        # wrap VQE_Driver.f() for gradient-free optimizers and store the interim values
+        def fun(x):
+            counter = len(vqe_history['energy'])
             energy  = self.f(x)
-            vqe_history['params'][counter] = tuple(x)
+            vqe_history['params'][counter] = x.copy()
             vqe_history['energy'][counter] = energy
             if self.verbose:
                 print(f'Optimization step {counter: <2}:\n\t Energy = {energy}')
             return energy
 
-        # wrap VQE_Driver.gradient() for the optimizer and store the interim values
-        def jac(x):
-            counter = get_counter(increment=False)
-            grad    = self.gradient(x)
-            vqe_history['gradient'][counter] = tuple(grad)
+        # wrap VQE_Driver.f_and_gradient() for the optimizer and store the interim values;
+        # the optimizer receives both at once so that they may share a single simulation
+        def fun_and_jac(x):
+            counter = len(vqe_history['energy'])
+            energy, grad = self.f_and_gradient(x)
+            vqe_history['params'][counter] = x.copy()
+            vqe_history['energy'][counter] = energy
+            vqe_history['gradient'][counter] = grad
             if self.verbose:
+                print(f'Optimization step {counter: <2}:\n\t Energy = {energy}')
                 print(f'\t    |∆| = {np.linalg.norm(grad)}')
-            return grad
+            return energy, grad
         
         if self.verbose:
             print('VQE simulation commencing...\n')
-        opt_out = minimize(
-            fun=fun, jac=jac, x0=x0, **kwargs
-        )
+        method = kwargs.get('method')
+        if isinstance(method, str) and method.lower() in ['nelder-mead', 'powell', 'cobyla', 'cobyqa']:
+            # these optimizers make no use of the gradient, so it is not computed
+            opt_out = minimize(fun=fun, x0=x0, **kwargs)
+        else:
+            opt_out = minimize(fun=fun_and_jac, jac=True, x0=x0, **kwargs)
         return serialize_opt_data(opt_out), vqe_history
 
 class ADAPT_VQE(VQE_Driver):
@@ -234,10 +385,12 @@ class ADAPT_VQE(VQE_Driver):
         TETRIS (bool): If True, TETRIS-ADAPT-VQE is performed. By default it is set to False.
         topology_aware (bool): If True, Hardware-Aware ADAPT-VQE is performed. By default it is set to True.
         topology_bias (float): Bias value used in Hardware-Aware ADAPT-VQE. It's default value is 1.
+        vqe_options (dict): Options passed to the BFGS optimizer when reoptimizing the ansatz at each ADAPT cycle.
     """
     # method by which to calculate the operator pool derivatives, either
     # commutators: compute the commutator of the observable with each pool element
-    # param_shift: use the parameter shift rule, requiring two expectation values per derivative
+    # param_shift: the parameter shift rule, which for a newly appended generator is equivalent
+    # to the commutator method but evaluates two rotated observables per pool element
     derivative_eval = 'commutators'
     # we have alost implemented TETRIS-ADAPT-VQE as per https://doi.org/10.48550/arXiv.2209.10562
     # that aims to reduce circuit-depth in the ADAPT routine by adding multiple excitation terms
@@ -247,6 +400,9 @@ class ADAPT_VQE(VQE_Driver):
     topology_bias = 1
     topology = None
     subgraph_match_depth = 3
+    # the ansatz parameters are warm-started from the previous cycle, so the VQE reoptimization
+    # at each cycle is a small correction that need only be converged relative to the pool gradient
+    vqe_options = {'maxiter':100}
     
     def __init__(self,
         observable: PauliwordOp,
@@ -270,20 +426,50 @@ class ADAPT_VQE(VQE_Driver):
         self.adapt_operator = PauliwordOp.empty(observable.n_qubits)
         self.opt_parameters = []
         self.current_state  = None
+        # the qubit support of each pool element is fixed, so is packed once into an integer
+        # bitmask such that checking for overlapping supports in TETRIS is a bitwise operation
+        self._pool_supports = [
+            int.from_bytes(row.tobytes(), 'big') for row in np.packbits(
+                self.excitation_pool.X_block | self.excitation_pool.Z_block, axis=1
+            )
+        ]
+        self._full_support = int.from_bytes(
+            np.packbits(np.ones(observable.n_qubits, dtype=bool)).tobytes(), 'big'
+        )
       
     @cached_property
     def commutators(self) -> List[PauliwordOp]:
         """ 
-        List of commutators [H, P] where P is some operator pool element.
+        List of commutators i[H, P] where P is some operator pool element.
+
+        Since each P is a single Pauli term, [H, P] = 2 H_P P where H_P consists of the
+        terms of H that anticommute with P. The products are formed for the whole pool 
+        in a single row-wise symplectic multiplication, rather than a full operator 
+        multiplication per pool element.
 
         Returns:
-            List of commutators [H, P]
+            List of commutators i[H, P]
         """
-        @process.parallelize
-        def f(P, obs):
-            return obs.commutator(P)*1j
-        commutators = f(self.excitation_pool, self.observable)
-        return commutators
+        anticommutes = ~self.excitation_pool.commutes_termwise(self.observable)
+        pool_index, obs_index = np.nonzero(anticommutes)
+        symp_matrix, coeff_vec = mul_symplectic(
+            self.observable.symp_matrix[obs_index], 2j*self.observable.coeff_vec[obs_index],
+            self.excitation_pool.symp_matrix[pool_index], self.excitation_pool.coeff_vec[pool_index]
+        )
+        # np.nonzero is row-major, so the products are grouped by pool element
+        split_indices = np.cumsum(np.sum(anticommutes, axis=1))[:-1]
+        return [
+            PauliwordOp(symp, coeff) for symp, coeff in zip(
+                np.split(symp_matrix, split_indices), np.split(coeff_vec, split_indices)
+            )
+        ]
+
+    @cached_property
+    def _pool_matrices(self) -> List[csr_matrix]:
+        """ 
+        Sparse matrix form of each operator pool element, fixed across ADAPT cycles.
+        """
+        return [P.to_sparse_matrix.tocsr() for P in self.excitation_pool]
         
     def _derivative_from_commutators(self, index: int) -> float:
         """ 
@@ -295,62 +481,93 @@ class ADAPT_VQE(VQE_Driver):
         Returns:
             Derivative (float) using the commutator method.
         """
-        assert self.current_state is not None
+        if self.current_state is None:
+            raise ValueError('The current state has not been prepared, derivatives are evaluated via pool_gradient')
         return self._f(observable=self.commutators[index], state=self.current_state) 
     
     def _derivative_from_param_shift(self, index):
         """ 
         Calculate the derivative using the parameter shift rule.
 
+        The pool element is appended to the end of the ansatz, so the shifted states 
+        differ from the current state by a single rotation through ±π/4. This is absorbed 
+        into the observable as a Clifford rotation rather than resimulating the circuit.
+        This is equivalent to _derivative_from_commutators.
+
          Args:
             index (int): Index
 
         Returns:
             Derivative (float) using the parameter shift rule.
         """
-        adapt_op_temp = self.adapt_operator.append(self.excitation_pool[index])
-        circuit_temp = PauliwordOp_to_QuantumCircuit(
-            PwordOp=adapt_op_temp, ref_state=self.ref_state, bind_params=False)
-        upper_state = self.get_state(circuit_temp, np.append(self.opt_parameters, +np.pi/4))
-        lower_state = self.get_state(circuit_temp, np.append(self.opt_parameters, -np.pi/4))
-        return self._f(self.observable,upper_state) - self._f(self.observable,lower_state)
+        if self.current_state is None:
+            raise ValueError('The current state has not been prepared, derivatives are evaluated via pool_gradient')
+        P = self.excitation_pool[index]
+        if self.expectation_eval == 'observable_rotation':
+            upper_energy = self._f(self.observable, [(P, -np.pi/2)] + self.current_state)
+            lower_energy = self._f(self.observable, [(P, +np.pi/2)] + self.current_state)
+        else:
+            upper_energy = self._f(self.observable.perform_rotations([(P, -np.pi/2)]), self.current_state)
+            lower_energy = self._f(self.observable.perform_rotations([(P, +np.pi/2)]), self.current_state)
+        return upper_energy - lower_energy
 
     def pool_gradient(self):
         """ 
         Get the operator pool gradient by calculating the derivative with respect to
-        each element of the pool. This is parallelized for all but the symbolic_projector
+        each element of the pool. The array methods contract the statevector directly with
+        each pool element; otherwise this is parallelized for all but the symbolic_projector
         expectation value calculation method as that is already multiprocessed and therefore
         would result in nested daemonic processes.
 
         Returns:
             Operator pool gradient (np.array)
         """
+        if self.derivative_eval not in ['commutators', 'param_shift']:
+            raise ValueError('Unrecognised derivative_eval method')
+
+        # the ansatz is usually prepared already, only rebuild if the adapt_operator has changed since
+        if not np.array_equal(self.excitation_generators.symp_matrix, self.adapt_operator.symp_matrix):
+            self.prepare_for_evolution(self.adapt_operator)
+        # the current state is shared by all pool derivatives so is computed only once
+        if self.expectation_eval == 'observable_rotation':
+            self.current_state = self.get_state(self.excitation_generators, self.opt_parameters)
+        else:
+            self.current_state = self.get_state(self.circuit, self.opt_parameters)
+
+        gradient = np.empty(self.excitation_pool.n_terms, dtype=np.float64)
+        if self.derivative_eval == 'commutators' and self.expectation_eval in ['dense_array', 'sparse_array']:
+            # <ψ|i[H,P]|ψ> = -2 Im<Hψ|Pψ>, so H|ψ> is formed once and each pool element
+            # costs a single sparse matrix-vector product, with no commutator construction
+            psi = self.current_state
+            if issparse(psi):
+                psi = psi.toarray()
+            psi = psi.reshape(-1)
+            H_psi = self._obs_sparse @ psi
+            for index, P_matrix in enumerate(self._pool_matrices):
+                gradient[index] = -2*np.vdot(H_psi, P_matrix @ psi).imag
+            return gradient
+
         if self.derivative_eval == 'commutators':
             self.commutators # to ensure this has been cached, else nested daemonic process occurs            
-            if self.expectation_eval == 'observable_rotation':
-                self.current_state = self.get_state(self.adapt_operator, self.opt_parameters)
-            else:
-                circuit_temp = PauliwordOp_to_QuantumCircuit(
-                    PwordOp=self.adapt_operator, ref_state=self.ref_state, bind_params=False)
-                self.current_state = self.get_state(circuit_temp, self.opt_parameters)
-            if self.expectation_eval in ['sparse_array', 'symbolic_direct', 'observable_rotation']:
-                # the commutator method may be parallelized since the state is constant
-                @process.parallelize
-                def f(index, obs):
-                    return obs._derivative_from_commutators(index)
-                gradient = f(range(self.excitation_pool.n_terms), self)
-            else:
-                # ... unless using symbolic_projector since this is multiprocessed
-                gradient = list(map(self._derivative_from_commutators, range(self.excitation_pool.n_terms)))
-        
-        elif self.derivative_eval == 'param_shift':
-            # not parallelizable due the Statevector already using multiprocessing! 
-            gradient = list(map(self._derivative_from_param_shift, range(self.excitation_pool.n_terms)))
-        
+            derivative = ADAPT_VQE._derivative_from_commutators
         else:
-            raise ValueError('Unrecognised derivative_eval method')
+            derivative = ADAPT_VQE._derivative_from_param_shift
+
+        if (
+                self.expectation_eval in ['sparse_array', 'symbolic_direct', 'observable_rotation'] and
+                self.observable.n_qubits >= self.serial_qubit_threshold
+            ):
+            # the pool derivatives may be parallelized since the state is constant
+            @process.parallelize
+            def f(index, obs):
+                return derivative(obs, index)
+            gradient[:] = f(range(self.excitation_pool.n_terms), self)
+        else:
+            # ... unless using symbolic_projector since this is multiprocessed, or the problem is small
+            for index in range(self.excitation_pool.n_terms):
+                gradient[index] = derivative(self, index)
         
-        return np.asarray(gradient)
+        return gradient
     
     def pool_score(self):
         """ 
@@ -400,32 +617,36 @@ class ADAPT_VQE(VQE_Driver):
         gmax=1
         anew=1
         aold=0
-        
+
         while (
                 gmax>gtol and adapt_cycle<=max_cycles and 
                 abs(anew-aold)>atol and abs(anew-target)>target_error
             ):
             # save the previous gmax to compare for the gdiff check
-            aold = deepcopy(anew)
+            aold = anew
             # calculate gradient across the pool and select term with the largest derivative
             scores = self.pool_score()
-            grad_rank = list(map(int, np.argsort(scores)[::-1]))
-            gmax = scores[grad_rank[0]]
+            gmax_index = int(np.argmax(scores))
+            gmax = scores[gmax_index]
 
             # TETRIS-ADAPT-VQE
             if self.TETRIS:
+                # only pool elements above the gradient threshold may be selected alongside
+                # the largest, so just these are ranked rather than sorting the whole pool
+                candidates = np.flatnonzero(scores >= gtol)
+                if candidates.size == 0:
+                    candidates = np.array([gmax_index])
+                grad_rank = list(map(int, candidates[np.argsort(scores[candidates])[::-1]]))
                 new_excitation_list = []
-                support_mask = np.zeros(self.observable.n_qubits, dtype=bool)
+                support_mask = 0
                 for i in grad_rank:
-                    new_excitation = self.excitation_pool[i]
-                    support_exists = (new_excitation.X_block | new_excitation.Z_block) & support_mask
-                    if ~np.any(support_exists):
-                        new_excitation_list.append(new_excitation)
-                        support_mask = support_mask | (new_excitation.X_block | new_excitation.Z_block)
-                    if np.all(support_mask) or scores[i] < gtol:
+                    if not self._pool_supports[i] & support_mask:
+                        new_excitation_list.append(self.excitation_pool[i])
+                        support_mask |= self._pool_supports[i]
+                    if support_mask == self._full_support:
                         break
             else:
-                new_excitation_list = [self.excitation_pool[grad_rank[0]]]
+                new_excitation_list = [self.excitation_pool[gmax_index]]
                 
             # append new term(s) to the adapt_operator that stores our ansatz as it expands
             n_new_terms = len(new_excitation_list)
@@ -443,7 +664,8 @@ class ADAPT_VQE(VQE_Driver):
             # having selected a new term to append to the ansatz, reoptimize with VQE
             self.prepare_for_evolution(self.adapt_operator)
             opt_out, vqe_hist = self.run(
-                x0=np.append(self.opt_parameters, [0]*n_new_terms), method='BFGS'
+                x0=np.append(self.opt_parameters, [0]*n_new_terms), method='BFGS',
+                options={'gtol':gtol/10, **self.vqe_options}
             )
             interim_data[adapt_cycle] = {
                 'output':opt_out, 'history':vqe_hist, 'gmax':gmax, 
@@ -453,7 +675,7 @@ class ADAPT_VQE(VQE_Driver):
             interim_data['history'].append(anew)
             if self.verbose:
                 print(F'\nEnergy at ADAPT cycle {adapt_cycle}: {anew: .5f}\n')
-            self.opt_parameters = opt_out['x']
+            self.opt_parameters = np.asarray(opt_out['x'])
             adapt_cycle+=1
 
         return {
@@ -466,6 +688,8 @@ class ADAPT_VQE(VQE_Driver):
 def serialize_opt_data(opt_data):
     return {
         'message':opt_data.message, 'success':opt_data.success, 'status':opt_data.status,
-        'fun':opt_data.fun, 'x':tuple(opt_data.x),'jac':tuple(opt_data.jac),
-        'nit':opt_data.nit, 'nfev':opt_data.nfev,'njev':opt_data.njev,
+        'fun':opt_data.fun, 'x':tuple(opt_data.x),
+        # gradient-free optimizers do not report the gradient
+        'jac':tuple(opt_data.jac) if 'jac' in opt_data else None,
+        'nit':opt_data.nit, 'nfev':opt_data.nfev,'njev':opt_data.get('njev', 0),
     }
\ No newline at end of file
@@ -1,5 +1,7 @@
 from symmer.operators import PauliwordOp
+from symmer.operators.utils import mul_symplectic, unpack_symplectic
 import numpy as np
+import numba as nb
 from typing import Dict, List, Optional, Tuple, Union
 import warnings
 
@@ -8,21 +10,26 @@ class AntiCommutingOp(PauliwordOp):
 
     def __init__(self,
                  AC_op_symp_matrix: np.array,
-                 coeff_list: np.array):
+                 coeff_list: np.array,
+                 validate: bool = True):
         """
         Args:
             AC_op_symp_matrix (np.array): The symmetric matrix representation of the anti-commuting operator.
             coeff_list (np.array): The coefficient list associated with the anti-commuting operator.
+            validate (bool, optional): Whether to check the terms pairwise anticommute. This builds the
+                adjacency matrix, so may be skipped for operators already known to anticommute. Defaults to True.
 
         Raises:
-            AssertionError: If the operators do not anticommute.
+            AssertionError: If validate is set and the operators do not anticommute.
         """
         super().__init__(AC_op_symp_matrix, coeff_list)
 
-        # check all operators anticommute
-        adj_mat = self.adjacency_matrix
-        adj_mat[np.diag_indices_from(adj_mat)] = False
-        assert ~np.any(adj_mat), 'operator needs to be made of anti-commuting Pauli operators'
+        if validate:
+            # check all operators anticommute (off-diagonal only, leaving the cached adjacency matrix intact)
+            off_diagonal = ~np.eye(self.n_terms, dtype=bool)
+            assert ~np.any(self.adjacency_matrix[off_diagonal]), 'operator needs to be made of anti-commuting Pauli operators'
+        # only a validated operator is known to pairwise anticommute
+        self._validated = validate
 
         self.X_sk_rotations = []
         self.R_LCU = None
@@ -63,16 +70,18 @@ class AntiCommutingOp(PauliwordOp):
 
     @classmethod
     def from_PauliwordOp(cls,
-            PwordOp: PauliwordOp
+            PwordOp: PauliwordOp,
+            validate: bool = True
         ) -> 'AntiCommutingOp':
         """
         Args:
             PwordOp (PauliwordOp): The PauliwordOp instance to initialize the AntiCommutingOp from.
+            validate (bool, optional): Whether to check the terms pairwise anticommute. Defaults to True.
 
         Returns:
             AntiCommutingOp: An AntiCommutingOp instance initialized from the given PauliwordOp.
         """
-        return cls(PwordOp.symp_matrix, PwordOp.coeff_vec)
+        return cls(PwordOp.symp_matrix, PwordOp.coeff_vec, validate=validate)
 
 
     def get_least_dense_term_index(self):
@@ -85,17 +94,9 @@ class AntiCommutingOp(PauliwordOp):
         Returns:
             s_index (int): index of least dense term in objects symp_matrix and coeff_vec.
         """
-        ### np.logical_or(X_block, Z_block)
-        # pos_terms_occur = np.logical_or(self.symp_matrix[:, :self.n_qubits], self.symp_matrix[:, self.n_qubits:])
-        # int_list = pos_terms_occur @ (1 << np.arange(pos_terms_occur.shape[1], dtype=object)[::-1])
-        # s_index = np.argmin(int_list)
-
         pos_terms_occur = np.logical_or(self.symp_matrix[:, :self.n_qubits], self.symp_matrix[:, self.n_qubits:])
-        symp_matrix_view = np.ascontiguousarray(pos_terms_occur).view(
-            np.dtype((np.void, pos_terms_occur.dtype.itemsize * pos_terms_occur.shape[1]))
-        )
-        sort_order = np.argsort(symp_matrix_view.ravel())
-        s_index = sort_order[0]
+        # lexsort takes its primary key last, so reverse the columns to compare from the first qubit
+        s_index = np.lexsort(pos_terms_occur.T[::-1])[0]
 
         return s_index
 
@@ -110,45 +111,29 @@ class AntiCommutingOp(PauliwordOp):
         """
         if AC_op.n_terms == 1:
             return AC_op
-        else:
-            # s_index fixed to zero (re-order done in unitary_partitioning method!)
-            s_index = 0
-            k_index = 1
-
-            op_for_rotation = AC_op.copy()
-
-            # take β_s P_s
-            P_s = PauliwordOp(op_for_rotation.symp_matrix[s_index], [1])
-            β_s = op_for_rotation.coeff_vec[s_index]
-            β_k = op_for_rotation.coeff_vec[k_index]
-
-            theta_sk = np.arctan(β_k / β_s)
-            if β_s.real < 0:
-                theta_sk = theta_sk + np.pi
-
-            # check
-            assert (np.isclose((β_k * np.cos(theta_sk) - β_s * np.sin(theta_sk)), 0)), 'term not zeroing out'
-
-            # -X_sk = -1j * Ps @ Pk
-            jP_k = PauliwordOp(op_for_rotation.symp_matrix[k_index], [-1j])
-            X_sk = P_s * jP_k
-            if X_sk.coeff_vec[0].real < 0:
-                X_sk.coeff_vec[0] *= -1
-                theta_sk *= -1
-
-            self.X_sk_rotations.append((X_sk, theta_sk))
-
-            # update coeffs
-            op_for_rotation.coeff_vec[s_index] = np.sqrt(β_s ** 2 + β_k ** 2)
-            op_for_rotation.coeff_vec[k_index] = 0
 
-            # build op without k term and (included modified s term)
-            AC_op_rotated = PauliwordOp(np.delete(op_for_rotation.symp_matrix, k_index, axis=0),
-                                        np.delete(op_for_rotation.coeff_vec, k_index, axis=0))
+        # invariant: P_s is row zero (re-order done in unitary_partitioning method!)
+        # each step rotates the k-th term onto P_s, so the reduced operator is only
+        # ever β_s P_s, with β_s growing as the running norm of the coefficients
+        P_s_symp = AC_op.symp_matrix[0]
+        β = AC_op.coeff_vec.real
+        running_norms = np.sqrt(np.cumsum(β ** 2))
+        β_s = np.concatenate([β[:1], running_norms[1:-1]])
+        theta_sk = np.arctan2(β[1:], β_s)
+
+        # -X_sk = -1j * Ps @ Pk for every k at once, sign absorbed into theta_sk
+        X_sk_symp, X_sk_coeffs = mul_symplectic(
+            P_s_symp[np.newaxis, :], 1, AC_op.symp_matrix[1:], -1j
+        )
+        X_sk_signs = np.sign(X_sk_coeffs.real)
+        theta_sk *= X_sk_signs
 
-            ## know how operator acts therefore don't need to actually do rotations
+        self.X_sk_rotations += [
+            (PauliwordOp(X_sk_symp[[k_index]], [1]), theta) for k_index, theta in enumerate(theta_sk)
+        ]
 
-            return self._recursive_seq_rotations(AC_op_rotated)
+        ## know how operator acts therefore don't need to actually do rotations
+        return PauliwordOp(P_s_symp[np.newaxis, :], [running_norms[-1]])
 
     def unitary_partitioning(self, s_index: int=None, up_method: Optional[str]='seq_rot') \
             -> Tuple[PauliwordOp, Union[PauliwordOp, List[Tuple[PauliwordOp, float]]], float, "AntiCommutingOp"]:
@@ -177,18 +162,16 @@ class AntiCommutingOp(PauliwordOp):
             warnings.warn(f's indexed term has zero coeff, s_index set to {s_index} so that nonzero operator is rotated onto')
        
         s_index = int(s_index)
-        BsPs    = self[s_index]
 
-        # NOTE: term to reduce to is at the top of sym matrix i.e. s_index of ZERO now!
-        no_BsPs = (self - BsPs).cleanup()
-        if (len(no_BsPs.coeff_vec)==1 and no_BsPs.coeff_vec[0]==0):
-            AC_op = BsPs
-        else:
-            AC_op = BsPs.append(no_BsPs)
+        # NOTE: term to reduce to is moved to the top of sym matrix i.e. s_index of ZERO now!
+        # (permute rows rather than subtract and append, dropping negligible terms as cleanup would)
+        nonzero = np.flatnonzero(np.abs(self.coeff_vec) > 1e-15)
+        perm = np.concatenate([[s_index], nonzero[nonzero != s_index]])
+        AC_op = PauliwordOp(self.symp_matrix[perm], self.coeff_vec[perm])
 
         if AC_op.n_terms == 1:
             rotations = []
-            gamma_l = np.linalg.norm(AC_op.coeff_vec)
+            gamma_l = np.sqrt(np.vdot(AC_op.coeff_vec, AC_op.coeff_vec).real)
             AC_op.coeff_vec = AC_op.coeff_vec / gamma_l
             Ps = AC_op
             return Ps, rotations, gamma_l, self.multiply_by_constant(1/gamma_l)
@@ -197,7 +180,7 @@ class AntiCommutingOp(PauliwordOp):
 
             assert np.isclose(np.sum(AC_op.coeff_vec.imag), 0), 'cannot apply unitary partitioning to operator with complex coeffs'
 
-            gamma_l = np.linalg.norm(AC_op.coeff_vec)
+            gamma_l = np.sqrt(np.vdot(AC_op.coeff_vec, AC_op.coeff_vec).real)
             AC_op.coeff_vec = AC_op.coeff_vec / gamma_l
 
             if up_method=='seq_rot':
@@ -219,9 +202,10 @@ class AntiCommutingOp(PauliwordOp):
     def multiply_by_constant(self, constant: float) -> "AntiCommutingOp":
         """ Return AntiCommutingOp under constant multiplication
         """
-        AC_op_copy = self.copy()
-        AC_op_copy.coeff_vec *= constant
-        return AC_op_copy
+        # rescaling cannot change commutation, so skip validation and inherit its outcome
+        scaled_op = AntiCommutingOp(self.symp_matrix, self.coeff_vec * constant, validate=False)
+        scaled_op._validated = self._validated
+        return scaled_op
     
     @classmethod
     def random(cls, n_qubits: int, n_terms: Union[None, int]=None, apply_clifford=True) -> "AntiCommutingOp":
@@ -264,11 +248,11 @@ class AntiCommutingOp(PauliwordOp):
         βs = AC_op.coeff_vec[s_index]
 
         #  ∑ β_k 𝑃_k  ... note this doesn't contain 𝛽_s 𝑃_s
-        no_βsPs = AC_op - (Ps_LCU.multiply_by_constant(βs))
+        no_βsPs_symp = AC_op.symp_matrix[s_index+1:]
+        no_βsPs_coeffs = AC_op.coeff_vec[s_index+1:]
 
-        # Ω_𝑙 ∑ 𝛿_k 𝑃_k  ... renormalized!
-        omega_l = np.linalg.norm(no_βsPs.coeff_vec)
-        no_βsPs.coeff_vec = no_βsPs.coeff_vec / omega_l
+        # Ω_𝑙 ∑ 𝛿_k 𝑃_k  ... renormalized! (1/Ω_𝑙 is folded into the R_LCU scaling below)
+        omega_l = np.sqrt(np.vdot(no_βsPs_coeffs, no_βsPs_coeffs).real)
 
         phi_n_1 = np.arccos(βs)
         # require sin(𝜙_{𝑛−1}) to be positive...
@@ -276,14 +260,16 @@ class AntiCommutingOp(PauliwordOp):
             phi_n_1 = 2 * np.pi - phi_n_1
 
         alpha = phi_n_1
-        I_term = 'I' * Ps_LCU.n_qubits
-        self.R_LCU = PauliwordOp.from_dictionary({I_term: np.cos(alpha / 2)})
-
         sin_term = -np.sin(alpha / 2)
 
-        for dkPk in no_βsPs:
-            dk_PkPs = dkPk * Ps_LCU
-            self.R_LCU += dk_PkPs.multiply_by_constant(sin_term)
+        # R_LCU = cos(α/2) I - sin(α/2) ∑ 𝛿_k 𝑃_k 𝑃_s, written straight into its buffers
+        R_LCU_symp = np.zeros((AC_op.n_terms, AC_op.symp_matrix.shape[1]), dtype=bool)
+        R_LCU_coeffs = np.empty(AC_op.n_terms, dtype=complex)
+        R_LCU_coeffs[0] = np.cos(alpha / 2)
+        R_LCU_symp[1:], R_LCU_coeffs[1:] = mul_symplectic(
+            no_βsPs_symp, no_βsPs_coeffs, Ps_LCU.symp_matrix, sin_term / omega_l
+        )
+        self.R_LCU = PauliwordOp(R_LCU_symp, R_LCU_coeffs).cleanup()
 
         return Ps_LCU
 
@@ -337,10 +323,12 @@ def LCU_as_seq_rot(R_LCU: PauliwordOp) -> List[Tuple[PauliwordOp, float]]:
     # ## phase correction - change angle by -pi in first rotation!
     # expon_p_terms[0] = (expon_p_terms[0][0], expon_p_terms[0][1]-np.pi)
 
+    # norms of the leading coefficients, ||coeff_vec[:(k + 1)]||, for every k at once
+    partial_norms = np.sqrt(np.cumsum(coeff_vec ** 2))
     for k in range(1, R_LCU.n_terms):
         P_k = R_LCU[k]
         c_k = coeff_vec[k]
-        theta_k = np.arcsin(c_k / np.linalg.norm(coeff_vec[:(k + 1)]))
+        theta_k = np.arcsin(c_k / partial_norms[k])
         P_k.coeff_vec[0] = 1
         expon_p_terms.append(tuple((P_k, theta_k)))
 
@@ -348,105 +336,164 @@ def LCU_as_seq_rot(R_LCU: PauliwordOp) -> List[Tuple[PauliwordOp, float]]:
     
     return expon_p_terms
 
-# from symmer.operators.utils import mul_symplectic
-# def conjugate_Pop_with_R(Pop:PauliwordOp,
-#                         R: PauliwordOp) -> PauliwordOp:
-#     """
-#     For a defined linear combination of pauli operators : R = ∑_{𝑖} ci Pi ... (note each P self-adjoint!)
-#
-#     perform the adjoint rotation R op R† =  R [∑_{a} ca Pa] R†
-#
-#     Args:
-#         R (PauliwordOp): operator to rotate Pop by
-#     Returns:
-#         rot_H (PauliwordOp): rotated operator
-#
-#     ### Notes
-#     R = ∑_{𝑖} ci Pi
-#     R^{†} = ∑_{j}  cj^{*} Pj
-#     note i and j here run over the same indices!
-#     apply R H R^{†} where H is Pop (current Pauli defined in class object)
-#
-#     ### derivation:
-#
-#     = (∑_{𝑖} ci Pi ) * (∑_{a} ca Pa ) * ∑_{j} cj^{*} Pj
-#
-#     = ∑_{a}∑_{i}∑_{j} (ci ca cj^{*}) Pi  Pa Pj
-#
-#     # can write as case for when i==j and i!=j
-#
-#     = ∑_{a}∑_{i=j} (ci ca ci^{*}) Pi  Pa Pi + ∑_{a}∑_{i}∑_{j!=i} (ci ca cj^{*}) Pi  Pa Pj
-#
-#     # let C by the termwise commutator matrix between H and R
-#     = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa  + ∑_{a}∑_{i}∑_{j!=i} (ci ca cj^{*}) Pi  Pa Pj
-#
-#     # next write final term over upper triange (as i and j run over same indices)
-#     ## so add common terms for i and j and make j>i
-#
-#     = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa
-#       + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*}) Pi  Pa Pj + (cj ca ci^{*}) Pj  Pa Pi
-#
-#     # then need to know commutation relation betwen terms in R
-#     ## given by adjaceny matrix of R... here A
-#
-#
-#     = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa
-#      + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*}) Pi  Pa Pj + (-1)^{C_{ia}+A_{ij}+C_{ja}}(cj ca ci^{*}) Pi  Pa Pj
-#
-#
-#     = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa
-#      + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*} + (-1)^{C_{ia}+A_{ij}+C_{ja}}(cj ca ci^{*})) Pi  Pa Pj
-#
-#
-#     """
-#     if Pop.n_terms == 1:
-#         rot_H = (R * Pop * R.dagger).cleanup()
-#     else:
-#         # anticommutes == 1 and commutes == 0
-#         commutation_check = (~Pop.commutes_termwise(R)).astype(int)
-#         adj_matrix = (~R.adjacency_matrix).astype(int)
-#
-#         c_list = R.coeff_vec
-#         ca_list = Pop.coeff_vec
-#
-#         # rot_H = PauliwordOp.empty(Pop.n_qubits)
-#         coeff_list = []
-#         sym_vec_list = []
-#         for ind_a, Pa_vec in enumerate(Pop.symp_matrix):
-#             for ind_i, Pi_vec in enumerate(R.symp_matrix):
-#                 sign = (-1) ** (commutation_check[ind_a, ind_i])
-#
-#                 coeff = c_list[ind_i] * c_list[ind_i].conj() * ca_list[ind_a]
-#                 # rot_H += PauliwordOp(Pa_vec, [coeff * sign])
-#                 sym_vec_list.append(Pa_vec)
-#                 coeff_list.append(coeff * sign)
-#
-#                 # PiPa = PauliwordOp(Pi_vec, [1]) * PauliwordOp(Pa_vec, [1])
-#                 phaseless_prod_PiPa, PiPa_coeff_vec = mul_symplectic(Pi_vec, 1,
-#                                                                      Pa_vec, 1)
-#
-#                 for ind_j, Pj_vec in enumerate(R.symp_matrix[ind_i + 1:]):
-#                     ind_j += ind_i + 1
-#
-#                     sign2 = (-1) ** (commutation_check[ind_a, ind_i] +
-#                                      commutation_check[ind_a, ind_j] +
-#                                      adj_matrix[ind_i, ind_j])
-#
-#                     coeff1 = c_list[ind_i] * ca_list[ind_a] * c_list[ind_j].conj()
-#                     coeff2 = c_list[ind_j] * ca_list[ind_a] * c_list[ind_i].conj()
-#
-#                     overall_coeff = (coeff1 + sign2 * coeff2)
-#                     if overall_coeff:
-#                         # calculate PiPa term outside of j loop
-#                         # overall_coeff_PiPaPj = PiPa * PauliwordOp(Pj_vec, [overall_coeff])
-#                         # rot_H += overall_coeff_PiPaPj
-#
-#                         phaseless_prod, coeff_vec = mul_symplectic(phaseless_prod_PiPa, PiPa_coeff_vec,
-#                                                                    Pj_vec, overall_coeff)
-#                         sym_vec_list.append(phaseless_prod)
-#                         coeff_list.append(coeff_vec)
-#
-#         rot_H = PauliwordOp(np.array(sym_vec_list),
-#                             coeff_list).cleanup()
-#     return rot_H
-#
+@nb.njit(cache=True)
+def _popcount64(v):
+    """ Number of set bits in a uint64 word (SWAR).
+    """
+    v = v - ((v >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    v = (v & np.uint64(0x3333333333333333)) + ((v >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    v = (v + (v >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return int((v * np.uint64(0x0101010101010101)) >> np.uint64(56))
+
+@nb.njit(cache=True)
+def _mul_symplectic_into(P1, P2, out):
+    """ Write the phaseless product of two packed symplectic rows into out and
+    return the Pauli phase i^k picked up by the product P1*P2.
+    """
+    n_words = P1.shape[0]//2
+    Y1 = Y2 = Y_out = parity = 0
+    for w in range(n_words):
+        x1, z1, x2, z2 = P1[w], P1[w+n_words], P2[w], P2[w+n_words]
+        x_out = x1 ^ x2
+        z_out = z1 ^ z2
+        out[w] = x_out
+        out[w+n_words] = z_out
+        Y1 += _popcount64(x1 & z1)
+        Y2 += _popcount64(x2 & z2)
+        Y_out += _popcount64(x_out & z_out)
+        parity += _popcount64(x1 & z2)
+    # P = i^{#Y} X^x Z^z, so re-ordering Z1 X2 contributes (-1)^{z1.x2}
+    k = (3*(Y1 + Y2) + Y_out + 2*parity) % 4
+    if k == 0:
+        return 1+0j
+    elif k == 1:
+        return 1j
+    elif k == 2:
+        return -1+0j
+    return -1j
+
+@nb.njit(cache=True)
+def _conjugate_kernel(Pop_symp, R_symp, c_list, ca_list, commutation_sign, adj_sign):
+    """ Compiled inner loop of conjugate_Pop_with_R on packed symplectic rows; writes the
+    i==j term of each Pa followed by its Pi Pa Pj terms for j>i, skipping any with zero coefficient.
+    """
+    n_Pop, n_R = Pop_symp.shape[0], R_symp.shape[0]
+    max_terms = n_Pop*(1 + n_R*(n_R-1)//2)
+    sym_out = np.empty((max_terms, Pop_symp.shape[1]), dtype=np.uint64)
+    coeff_out = np.empty(max_terms, dtype=np.complex128)
+    PiPa = np.empty(Pop_symp.shape[1], dtype=np.uint64)
+    idx = 0
+    for a in range(n_Pop):
+        # i==j terms: Pa is scaled by ∑_{i} (-1)^{C_{ia}} |ci|^2
+        diag = 0j
+        for i in range(n_R):
+            diag += commutation_sign[a,i] * (c_list[i]*np.conj(c_list[i]))
+        if ca_list[a]*diag != 0:
+            sym_out[idx] = Pop_symp[a]
+            coeff_out[idx] = ca_list[a]*diag
+            idx += 1
+        # i<j terms
+        for i in range(n_R):
+            PiPa_phase = _mul_symplectic_into(R_symp[i], Pop_symp[a], PiPa)
+            for j in range(i+1, n_R):
+                sign = commutation_sign[a,i] * commutation_sign[a,j] * adj_sign[i,j]
+                overall_coeff = ca_list[a]*(
+                    c_list[i]*np.conj(c_list[j]) + sign*c_list[j]*np.conj(c_list[i])
+                )
+                if overall_coeff == 0:
+                    continue
+                phase = _mul_symplectic_into(PiPa, R_symp[j], sym_out[idx])
+                coeff_out[idx] = PiPa_phase*phase*overall_coeff
+                idx += 1
+    return sym_out[:idx], coeff_out[:idx]
+
+def conjugate_Pop_with_R(Pop:PauliwordOp,
+                        R: PauliwordOp,
+                        commutation_matrix: Optional[np.array] = None) -> PauliwordOp:
+    """
+    For a defined linear combination of pauli operators : R = ∑_{𝑖} ci Pi ... (note each P self-adjoint!)
+
+    perform the adjoint rotation R op R† =  R [∑_{a} ca Pa] R†
+
+    Args:
+        Pop (PauliwordOp): operator to be rotated
+        R (PauliwordOp): operator to rotate Pop by
+        commutation_matrix (np.array, optional): precomputed Pop.commutes_termwise(R), to reuse across calls
+    Returns:
+        rot_H (PauliwordOp): rotated operator
+
+    ### Notes
+    R = ∑_{𝑖} ci Pi
+    R^{†} = ∑_{j}  cj^{*} Pj
+    note i and j here run over the same indices!
+    apply R H R^{†} where H is Pop (current Pauli defined in class object)
+
+    ### derivation:
+
+    = (∑_{𝑖} ci Pi ) * (∑_{a} ca Pa ) * ∑_{j} cj^{*} Pj
+
+    = ∑_{a}∑_{i}∑_{j} (ci ca cj^{*}) Pi  Pa Pj
+
+    # can write as case for when i==j and i!=j
+
+    = ∑_{a}∑_{i=j} (ci ca ci^{*}) Pi  Pa Pi + ∑_{a}∑_{i}∑_{j!=i} (ci ca cj^{*}) Pi  Pa Pj
+
+    # let C by the termwise commutator matrix between H and R
+    = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa  + ∑_{a}∑_{i}∑_{j!=i} (ci ca cj^{*}) Pi  Pa Pj
+
+    # next write final term over upper triange (as i and j run over same indices)
+    ## so add common terms for i and j and make j>i
+
+    = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa
+      + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*}) Pi  Pa Pj + (cj ca ci^{*}) Pj  Pa Pi
+
+    # then need to know commutation relation betwen terms in R
+    ## given by adjaceny matrix of R... here A
+
+
+    = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa
+     + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*}) Pi  Pa Pj + (-1)^{C_{ia}+A_{ij}+C_{ja}}(cj ca ci^{*}) Pi  Pa Pj
+
+
+    = ∑_{a}∑_{i=j} (-1)^{C_{ia}} (ci ca ci^{*}) Pa
+     + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*} + (-1)^{C_{ia}+A_{ij}+C_{ja}}(cj ca ci^{*})) Pi  Pa Pj
+
+
+    """
+    # anticommutes == True and commutes == False
+    if commutation_matrix is None:
+        commutation_matrix = Pop.commutes_termwise(R)
+    commutation_check = ~commutation_matrix
+    if isinstance(R, AntiCommutingOp) and R._validated:
+        # terms of R pairwise anticommute, as validated on init
+        adj_matrix = ~np.eye(R.n_terms, dtype=bool)
+    else:
+        adj_matrix = ~R.adjacency_matrix
+    # (-1)^{C_{ia}} and (-1)^{A_{ij}} as lookup tables for the kernel
+    commutation_sign = 1 - 2*commutation_check.astype(np.int8)
+    adj_sign = 1 - 2*adj_matrix.astype(np.int8)
+
+    if R.n_terms == 2:
+        # common two-term R (e.g. from LCU): only the (i,j)=(0,1) pair, vectorized over Pa
+        c0, c1 = R.coeff_vec
+        Pop_coeffs = Pop.coeff_vec
+        diag_coeffs = Pop_coeffs * (
+            commutation_sign[:,0] * abs(c0)**2 + commutation_sign[:,1] * abs(c1)**2
+        )
+        sign = commutation_sign[:,0] * commutation_sign[:,1] * adj_sign[0,1]
+        overall_coeff = Pop_coeffs * (c0*np.conj(c1) + sign*c1*np.conj(c0))
+        P0Pa_symp, P0Pa_coeffs = mul_symplectic(R.symp_matrix[[0]], 1, Pop.symp_matrix, overall_coeff)
+        P0PaP1_symp, P0PaP1_coeffs = mul_symplectic(P0Pa_symp, P0Pa_coeffs, R.symp_matrix[[1]], 1)
+        return PauliwordOp(
+            np.vstack([Pop.symp_matrix, P0PaP1_symp]),
+            np.concatenate([diag_coeffs, P0PaP1_coeffs])
+        ).cleanup()
+
+    # 64 qubits per word in the kernel
+    sym_out, coeff_out = _conjugate_kernel(
+        Pop._symp_packed, R._symp_packed, 
+        R.coeff_vec.astype(complex), Pop.coeff_vec.astype(complex), commutation_sign, adj_sign
+    )
+
+    rot_H = PauliwordOp(unpack_symplectic(sym_out, Pop.n_qubits), coeff_out).cleanup()
+    return rot_H
@@ -5,7 +5,7 @@ import networkx as nx
 import matplotlib.pyplot as plt
 from symmer import process
 from symmer.operators.utils import (
-    matmul_GF2, random_symplectic_matrix, string_to_symplectic, QubitOperator_to_dict, SparsePauliOp_to_dict,
+    matmul_GF2, pack_symplectic, numba_packed_matmul_GF2, random_symplectic_matrix, string_to_symplectic, QubitOperator_to_dict, SparsePauliOp_to_dict,
     symplectic_to_string, cref_binary, check_independent, check_jordan_independent, symplectic_cleanup,
     check_adjmat_noncontextual, symplectic_to_openfermion, binary_array_to_int, count1_in_int_bitstring
 )
@@ -19,6 +19,7 @@ from scipy.stats import unitary_group
 from scipy.sparse import csr_matrix, csc_matrix, coo_matrix, dok_matrix
 from openfermion import QubitOperator, count_qubits
 from qiskit.quantum_info import SparsePauliOp
+from qiskit._accelerate.sparse_pauli_op import unordered_unique
 warnings.simplefilter('always', UserWarning)
 
 from numba.core.errors import NumbaDeprecationWarning, NumbaPendingDeprecationWarning
@@ -70,7 +71,7 @@ class PauliwordOp:
 
     def set_processing_method(self, method):
         """ Set the method to use when running parallelizable processes. 
-        Valid options are: mp, ray, single_thread.
+        Valid options are: mp, ray, threads, single_thread.
         """
         process.method = method
         
@@ -963,7 +964,9 @@ class PauliwordOp:
         # Omega_PwordOp_symp = np.hstack((PwordOp.Z_block,  PwordOp.X_block)).astype(int)
         # return (self.symp_matrix @ Omega_PwordOp_symp.T) % 2 == 0
         
-        return ~matmul_GF2(self.symp_matrix, np.hstack((PwordOp.Z_block,  PwordOp.X_block)).T)
+        # swapping the packed X and Z words of PwordOp gives the symplectic form (Z | X)
+        Z_words, X_words = np.split(PwordOp._symp_packed, 2, axis=1)[::-1]
+        return ~numba_packed_matmul_GF2(self._symp_packed, np.hstack((Z_words, X_words)))
 
     def anticommutes_termwise(self,
             PwordOp: "PauliwordOp"
@@ -1046,6 +1049,17 @@ class PauliwordOp:
         commutator = self.commutator(PwordOp).cleanup()
         return (commutator.n_terms == 0 or np.all(commutator.coeff_vec[0] == 0))
         
+    @cached_property
+    def _symp_packed(self) -> np.array:
+        """ 
+        The symplectic matrix with its X and Z blocks packed into 64-bit words, reused by
+        every commutation check against this operator.
+
+        Returns:
+            np.array: uint64 array with rows of the form (X words | Z words).
+        """
+        return pack_symplectic(self.symp_matrix)
+
     @cached_property
     def adjacency_matrix(self) -> np.array:
         """ 
@@ -1140,7 +1154,7 @@ class PauliwordOp:
                 else:
                     # rotation of -pi/2 disregarding sign, fixed in next line
                     anticom_part = (anticom_self*Pword_copy).multiply_by_constant(-1j)
-                if int_part in [2,3]:
+                if int_part % 4 in [2,3]:
                     anticom_part = anticom_part.multiply_by_constant(-1)
                 # if rotation is Clifford cannot produce duplicate terms so cleanup not necessary
                 return PauliwordOp(
@@ -1540,8 +1554,8 @@ class PauliwordOp:
          + ∑_{a}∑_{i}∑_{j>i} (ci ca cj^{*} + (-1)^{C_{ia}+A_{ij}+C_{ja}}(cj ca ci^{*})) Pi  Pa Pj
         """
 
-        # see from symmer.operators.anticommuting_op import conjugate_Pop_with_R
-        raise NotImplementedError('not done yet. Full function at: from symmer.operators.anticommuting_op.conjugate_Pop_with_R')
+        from symmer.operators.anticommuting_op import conjugate_Pop_with_R
+        return conjugate_Pop_with_R(self, R)
 
 
 class QuantumState:
@@ -1782,20 +1796,18 @@ class QuantumState:
         
         if isinstance(mul_obj, QuantumState):
             assert(mul_obj.vec_type=='ket'), 'Cannot multiply a bra with another bra'
-            inner_product=0
-
-            # set left state to be smallest in number of bitstrings making loop short!
-            if self.state_op.n_terms < mul_obj.n_terms:
-                left_state = self
-                right_state = mul_obj
-            else:
-                left_state = mul_obj
-                right_state = self
-
-            # O(length_smallest_statevector) runtime. (Note linear rather than quadratic!)
-            for bstring, left_coeff in left_state.to_dictionary.items():
-                right_coeff = right_state.to_dictionary.get(bstring, 0)
-                inner_product += left_coeff * right_coeff
+            # identify matching basis states across the bra and ket in a single hashing pass over
+            # the stacked state matrices, rather than looping over dictionaries of bitstrings
+            unique_locations, inverse_map = unordered_unique(
+                np.vstack([self.state_matrix, mul_obj.state_matrix]).astype('uint16')
+            )
+            n_unique = unique_locations.shape[0]
+            bra_coeffs = np.zeros(n_unique, dtype=complex)
+            ket_coeffs = np.zeros(n_unique, dtype=complex)
+            # summing over the inverse map also combines any duplicated basis states
+            np.add.at(bra_coeffs, inverse_map[:self.n_terms], self.state_op.coeff_vec)
+            np.add.at(ket_coeffs, inverse_map[self.n_terms:], mul_obj.state_op.coeff_vec)
+            inner_product = np.sum(bra_coeffs * ket_coeffs)
 
             return inner_product
 
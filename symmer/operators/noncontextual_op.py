@@ -1,17 +1,20 @@
 import warnings
-import itertools
 import numpy as np
+import numba as nb
 import networkx as nx
 from cached_property import cached_property
 from time import time
-from functools import reduce
+from itertools import combinations
 from typing import Optional, Union, Tuple, List
 from matplotlib import pyplot as plt
-from scipy.optimize import shgo
+from scipy.optimize import minimize
+from scipy.sparse import csr_matrix
+from symmer import process
 from symmer.operators import PauliwordOp, IndependentOp, AntiCommutingOp, QuantumState
-from symmer.operators.utils import binomial_coefficient, perform_noncontextual_sweep
+from symmer.operators.utils import (
+    binomial_coefficient, perform_noncontextual_sweep, pack_GF2_rows, numba_packed_matmul_GF2, mul_symplectic
+)
 from symmer.utils import random_anitcomm_2n_1_PauliwordOp
-from symmer import process
 
 class NoncontextualOp(PauliwordOp):
     """ 
@@ -26,6 +29,7 @@ class NoncontextualOp(PauliwordOp):
         up_method (str): 
     """
     up_method = 'seq_rot'
+    dfs_parallel_min_terms = 1000
 
     def __init__(self,
             symp_matrix,
@@ -147,17 +151,18 @@ class NoncontextualOp(PauliwordOp):
         operator = H.sort(by='magnitude')
         noncontextual_ops = []
 
-        n=0
         start_time = time()
-        while n < H.n_terms and time()-start_time < runtime:
-            order = np.roll(np.arange(H.n_terms), -n)
-            ordered_operator = PauliwordOp(
-                symp_matrix=operator.symp_matrix[order],
-                coeff_vec=operator.coeff_vec[order]
+        if H.n_terms >= cls.dfs_parallel_min_terms:
+            # large operators dispatch every starting term at once, with the runtime checked by the workers
+            noncontextual_ops = _parallel_rolled_noncontextual_sweep(
+                range(H.n_terms), (operator, start_time + runtime)
             )
-            noncontextual_operator = perform_noncontextual_sweep(ordered_operator)
-            noncontextual_ops.append(noncontextual_operator)
-            n+=1
+            noncontextual_ops = [op for op in noncontextual_ops if op is not None]
+        else:
+            n=0
+            while n < H.n_terms and time()-start_time < runtime:
+                noncontextual_ops.append(_rolled_noncontextual_sweep(n, (operator, np.inf)))
+                n+=1
 
         if strategy == 'magnitude':
             noncontextual_operator = sorted(noncontextual_ops, key=lambda x:-np.sum(abs(x.coeff_vec)))[0]
@@ -180,14 +185,18 @@ class NoncontextualOp(PauliwordOp):
         Returns:
             NoncontextualOp: A NoncontextualOp instance constructed from the given operator.
         """
-        noncontextual_operator = cls._diag_noncontextual_op(H)
-        # order the remaining terms by coefficient magnitude
-        off_diag_terms = (H - noncontextual_operator).sort(by='magnitude')
-        # append terms that do not make the noncontextual_operator contextual!
-        for term in off_diag_terms:
-            if (noncontextual_operator+term).is_noncontextual:
-                noncontextual_operator+=term
-        
+        H = H.cleanup()
+        mask_diag = ~np.any(H.X_block, axis=1)
+        # order the off-diagonal terms by coefficient magnitude
+        off_diag_terms = H[~mask_diag].sort(by='magnitude')
+        # the diagonal terms commute so are all retained by a sweep that visits them first, after
+        # which it appends the off-diagonal terms that do not make the operator contextual
+        ordered_operator = PauliwordOp(
+            np.vstack([H.symp_matrix[mask_diag], off_diag_terms.symp_matrix]),
+            np.hstack([H.coeff_vec[mask_diag], off_diag_terms.coeff_vec])
+        )
+        noncontextual_operator = perform_noncontextual_sweep(ordered_operator)
+
         return cls.from_PauliwordOp(noncontextual_operator)
 
     @classmethod
@@ -480,8 +489,9 @@ class NoncontextualOp(PauliwordOp):
                 # choose clique representatives with the greatest coefficient
                 # see equation 3 of https://arxiv.org/pdf/2002.05693.pdf
                 clique_rep_list = [C.sort()[0] for C in self.decomposed.values()]
+                # representatives of distinct cliques anticommute by construction
                 self.clique_operator = AntiCommutingOp.from_PauliwordOp(
-                    sum(clique_rep_list)
+                    sum(clique_rep_list), validate=False
                 )
                 self.clique_operator.coeff_vec = np.ones_like(self.clique_operator.coeff_vec)
 
@@ -517,33 +527,48 @@ class NoncontextualOp(PauliwordOp):
         self.C_indices = jordan_recon_matrix[:, self.symmetry_generators.n_terms:]
         self.mask_S0 = ~np.any(self.C_indices, axis=1)
         self.mask_Ci = self.C_indices.astype(bool).T
+        # clique membership as a sparse matrix so every si is summed in one product
+        self._mask_Ci_csr = csr_matrix(self.mask_Ci.astype(float))
+        self._mask_S0_indices = np.where(self.mask_S0)[0]
+        # generator indices packed into 64-bit words for the nu-assignment parity
+        self._G_packed = pack_GF2_rows(self.G_indices.astype(bool))
         # individual elements of r_part commute with all of G_part - taking products over G_part with
         # a single element of r_part will therefore never produce a complex phase, but might result in
         # a sign flip that must be accounted for in the generator reconstruction:
-        multiply_indices = lambda inds:reduce(
-            lambda x,y:x*y, # pairwise multiplication of Pauli factors
-            noncon_generators[inds], # index the relevant noncontextual generating elements
-            PauliwordOp.from_list(['I'*self.n_qubits]) # initialise product with identity
-        ).coeff_vec[0].real
-
-        self.pauli_mult_signs = np.array(
-            list(map(multiply_indices,jordan_recon_matrix.astype(bool)))
-        ).astype(int)
+        # the products for every term are accumulated at once, multiplying on one generator at a time
+        # (in index order) for the terms whose reconstruction involves it. Terms reconstructed from at
+        # most one generator are that generator (or the identity) with sign +1 and are skipped
+        recon_mask = jordan_recon_matrix.astype(bool)
+        multi_generator_terms = np.where(np.sum(recon_mask, axis=1) >= 2)[0]
+        recon_mask = recon_mask[multi_generator_terms]
+        product_symp = np.zeros((multi_generator_terms.shape[0], 2*self.n_qubits), dtype=bool)
+        product_coeffs = np.ones(multi_generator_terms.shape[0], dtype=complex)
+        for generator_index, generator_symp in enumerate(noncon_generators.symp_matrix):
+            rows = recon_mask[:, generator_index]
+            if np.any(rows):
+                product_symp[rows], product_coeffs[rows] = mul_symplectic(
+                    product_symp[rows], product_coeffs[rows], generator_symp, 1
+                )
+        self.pauli_mult_signs = np.ones(self.n_terms, dtype=int)
+        self.pauli_mult_signs[multi_generator_terms] = product_coeffs.real.astype(int)
 
     def get_symmetry_contributions(self, nu: np.array) -> float:
         """
         """
-        nu = np.asarray(nu)
+        # parity of the generators assigned -1 in each term, as AND + popcount over packed words
+        nu_mask = pack_GF2_rows((np.asarray(nu) == -1).reshape(1, -1))
+        parity = numba_packed_matmul_GF2(self._G_packed, nu_mask)[:, 0]
         coeff_mod =  (
             # coefficient vector whose signs we are modifying:
             self.coeff_vec *
             # sign flips from generator reconstruction:
             self.pauli_mult_signs *
             # sign flips from nu assignment:
-            (-1)**np.count_nonzero(np.logical_and(self.G_indices==1, nu == -1), axis=1)
+            (1 - 2*parity.astype(int))
         )
-        s0 = np.sum(coeff_mod[self.mask_S0]).real
-        si = np.array([np.sum(coeff_mod[mask]).real for mask in self.mask_Ci])
+        coeff_mod = coeff_mod.real
+        s0 = np.sum(coeff_mod[self._mask_S0_indices])
+        si = self._mask_Ci_csr @ coeff_mod
         return s0, si
 
     def get_energy(self, nu: np.array, AC_ev: int = -1) -> float:
@@ -660,6 +685,8 @@ class NoncontextualOp(PauliwordOp):
 class NoncontextualSolver:
 
     method:str = 'brute_force'
+    relaxation_starts:int = 30
+    relaxation_seed:int = 0
     _nu = None
 
     def __init__(
@@ -685,23 +712,33 @@ class NoncontextualSolver:
 
     def energy_via_brute_force(self) -> Tuple[float, np.array, np.array]:
         """ 
-        Does what is says on the tin! Try every single eigenvalue assignment in parallel
+        Does what is says on the tin! Try every single eigenvalue assignment at once
         and return the minimizing noncontextual configuration. This scales exponentially in 
         the number of unassigned symmetry elements.
         """
-        if np.all(self.fixed_ev_mask):
-            nu_list = self.fixed_eigvals.reshape([1,-1])
-        else:
-            search_size = 2**np.sum(~self.fixed_ev_mask)
-            nu_list = np.ones([search_size, self.NC_op.symmetry_generators.n_terms], dtype=int)
-            nu_list[:,self.fixed_ev_mask] = np.tile(self.fixed_eigvals, [search_size,1])
-            nu_list[:,~self.fixed_ev_mask] = np.array(list(itertools.product([-1,1],repeat=np.sum(~self.fixed_ev_mask))))
-        
-        # # optimize over all discrete value assignments of nu in parallel
-        full_search_results = get_noncon_energy(nu_list, self.NC_op)
-        energy, fixed_nu = min(full_search_results, key=lambda x:x[0])
+        nu = np.ones(self.NC_op.symmetry_generators.n_terms, dtype=int)
+        nu[self.fixed_ev_mask] = self.fixed_eigvals
+        free_indices = np.where(~self.fixed_ev_mask)[0]
+
+        # score all discrete value assignments of nu in a single compiled pass, in single precision
+        # as it only ranks the assignments; each term belongs to at most one clique (-1 for the S0 terms)
+        clique_of_term = np.full(self.NC_op.n_terms, -1)
+        term_indices, clique_indices = np.nonzero(self.NC_op.C_indices)
+        clique_of_term[term_indices] = clique_indices
+        _, min_gray_code = _brute_force_kernel(
+            self.NC_op.G_indices.astype(np.bool_),
+            (self.NC_op.coeff_vec * self.NC_op.pauli_mult_signs).real.astype(np.float32),
+            clique_of_term,
+            self.NC_op.n_cliques,
+            nu == -1,
+            free_indices
+        )
+        # bit j of the minimizing Gray code is set when free generator j is assigned -1
+        nu[free_indices[(min_gray_code >> np.arange(len(free_indices))) & 1 == 1]] = -1
+        # re-score the minimizing assignment in double precision
+        energy = self.NC_op.get_energy(nu)
 
-        return energy, fixed_nu
+        return energy, nu
 
     #################################################################
     ###################### BINARY RELAXATION ########################
@@ -711,28 +748,141 @@ class NoncontextualSolver:
         """ 
         Relax the binary value assignment of symmetry generators to continuous variables.
         """
-        # optimize discrete value assignments nu by relaxation to continuous variables
-        nu_bounds = [(0, np.pi)]*(self.NC_op.symmetry_generators.n_terms-np.sum(self.fixed_ev_mask))
-
-        def get_nu(angles):
+        NC_op = self.NC_op
+        nu_fixed = np.ones(NC_op.symmetry_generators.n_terms)
+        nu_fixed[self.fixed_ev_mask] = self.fixed_eigvals
+        free_mask = ~self.fixed_ev_mask
+        if not np.any(free_mask):
+            return NC_op.get_energy(nu_fixed), nu_fixed.astype(int)
+
+        G_mask = NC_op.G_indices.astype(bool)
+        coeffs = (NC_op.coeff_vec * NC_op.pauli_mult_signs).real
+        n_terms = NC_op.n_terms
+
+        def energy_and_gradient(nu_free):
             """ 
-            Build nu vector given fixed values.
+            Relaxed energy for continuous nu in [-1, 1] on the free generators, where the sign of each
+            term is the product of nu over its generators (exact when nu = ±1), and its analytic gradient.
             """
-            nu = np.ones(self.NC_op.symmetry_generators.n_terms)
-            nu[self.fixed_ev_mask] = self.fixed_eigvals
-            nu[~self.fixed_ev_mask] = np.cos(angles)
-            return nu
-
-        optimizer_output = shgo(func=lambda angles:self.NC_op.get_energy(get_nu(angles)), bounds=nu_bounds)
-        # if optimization was successful the optimal angles should consist of 0 and pi
-        fix_nu = np.sign(np.array(get_nu(np.cos(optimizer_output['x'])))).astype(int)
-        self.NC_op.symmetry_generators.coeff_vec = fix_nu 
-        return optimizer_output['fun'], fix_nu
+            nu = nu_fixed.copy()
+            nu[free_mask] = nu_free
+            factors = np.where(G_mask, nu, 1.)
+            # leave-one-out products give the derivative of each term sign w.r.t. each nu_k
+            prefix = np.hstack([np.ones((n_terms, 1)), np.cumprod(factors[:, :-1], axis=1)])
+            suffix = np.hstack([np.cumprod(factors[:, :0:-1], axis=1)[:, ::-1], np.ones((n_terms, 1))])
+            d_signs = np.where(G_mask, prefix * suffix, 0.)
+            coeff_mod = coeffs * prefix[:, -1] * factors[:, -1]
+            s0 = np.sum(coeff_mod[NC_op._mask_S0_indices])
+            si = NC_op._mask_Ci_csr @ coeff_mod
+            si_norm = np.linalg.norm(si)
+            # derivative of s0 - ||si|| w.r.t. each modified coefficient
+            dE_dcoeff = NC_op.mask_S0.astype(float)
+            if si_norm > 0:
+                dE_dcoeff -= NC_op._mask_Ci_csr.T @ si / si_norm
+            dE_dnu = (dE_dcoeff * coeffs) @ d_signs
+            return s0 - si_norm, dE_dnu[free_mask]
+
+        def energy_and_gradient_tanh(x):
+            """ 
+            The relaxed energy under nu = tanh(x), for an unconstrained search over x.
+            """
+            nu_free = np.tanh(x)
+            energy, gradient = energy_and_gradient(nu_free)
+            return energy, gradient * (1 - nu_free**2)
+
+        # multi-start gradient-based search from seeded starting points; each optimum is rounded
+        # to the nearest binary assignment (0 -> +1) and then polished by flips of one or two generators
+        rng = np.random.default_rng(self.relaxation_seed)
+        n_free = np.sum(free_mask)
+        best_energy, best_nu = np.inf, None
+        for _ in range(self.relaxation_starts):
+            optimizer_output = minimize(
+                energy_and_gradient_tanh, x0=rng.normal(scale=2, size=n_free), jac=True,
+                method='L-BFGS-B', bounds=[(-3, 3)]*n_free
+            )
+            nu = nu_fixed.copy()
+            nu[free_mask] = np.where(optimizer_output['x'] < 0, -1, 1)
+            energy, nu = self._flip_descent(nu)
+            if energy < best_energy:
+                best_energy, best_nu = energy, nu.astype(int)
 
+        self.NC_op.symmetry_generators.coeff_vec = best_nu
+        return best_energy, best_nu
 
-@process.parallelize
-def get_noncon_energy(nu: np.array, noncon_H:NoncontextualOp) -> float:
+    def _flip_descent(self, nu: np.array) -> Tuple[float, np.array]:
+        """ 
+        Greedy local search from a binary assignment nu: repeatedly apply the flip of one or two
+        free generators that lowers the energy the most, until no such flip improves it.
+        """
+        nu = nu.copy()
+        energy = self.NC_op.get_energy(nu)
+        free_indices = np.where(~self.fixed_ev_mask)[0]
+        flips = [[i] for i in free_indices] + [[i, j] for i, j in combinations(free_indices, 2)]
+        while True:
+            flip_energies = []
+            for flip in flips:
+                nu[flip] *= -1
+                flip_energies.append(self.NC_op.get_energy(nu))
+                nu[flip] *= -1
+            best_flip = np.argmin(flip_energies)
+            if flip_energies[best_flip] >= energy - 1e-12:
+                return energy, nu
+            nu[flips[best_flip]] *= -1
+            energy = flip_energies[best_flip]
+
+
+def _rolled_noncontextual_sweep(n: int, shared: Tuple[PauliwordOp, float]) -> PauliwordOp:
+    """ 
+    Sweep over the terms of the operator starting from the n-th, see NoncontextualOp._dfs_noncontextual_op.
+    The shared tuple holds the operator and the wall-clock deadline, after which None is returned
+    for any starting term other than the first.
     """
-    The classical objective function that encodes the noncontextual energies.
+    operator, deadline = shared
+    if n > 0 and time() > deadline:
+        return None
+    order = np.roll(np.arange(operator.n_terms), -n)
+    ordered_operator = PauliwordOp(
+        symp_matrix=operator.symp_matrix[order],
+        coeff_vec=operator.coeff_vec[order]
+    )
+    return perform_noncontextual_sweep(ordered_operator)
+
+_parallel_rolled_noncontextual_sweep = process.parallelize(_rolled_noncontextual_sweep)
+
+@nb.njit(cache=True)
+def _brute_force_kernel(G_indices, coeffs, clique_of_term, n_cliques, nu_negative, free_indices):
     """
-    return noncon_H.get_energy(nu), nu
\ No newline at end of file
+    Evaluate the noncontextual energy (with AC_ev = -1) of every assignment of the free generators,
+    returning the minimum and the Gray code of its assignment (bit j set when free_indices[j] is -1).
+    Assignments are visited in Gray code order, so consecutive ones differ by a single generator and
+    the term parities are updated with one column of G_indices rather than recomputed. The energies
+    are accumulated in single precision (coeffs is float32).
+    """
+    n_terms, n_gen = G_indices.shape
+    # parities of the initial assignment, with every free generator set to +1
+    parity = np.zeros(n_terms, dtype=np.bool_)
+    for t in range(n_terms):
+        for g in range(n_gen):
+            parity[t] ^= G_indices[t, g] & nu_negative[g]
+    si = np.empty(n_cliques, dtype=np.float32)
+    min_energy = np.inf
+    min_gray_code = 0
+    for i in range(2**free_indices.shape[0]):
+        if i > 0:
+            # the generator flipped between Gray codes i-1 and i is the lowest set bit of i
+            flipped = free_indices[int(np.log2(i & -i))]
+            for t in range(n_terms):
+                parity[t] ^= G_indices[t, flipped]
+        s0 = np.float32(0.)
+        si[:] = 0.
+        for t in range(n_terms):
+            term = -coeffs[t] if parity[t] else coeffs[t]
+            if clique_of_term[t] < 0:
+                s0 += term
+            else:
+                si[clique_of_term[t]] += term
+        energy = s0 - np.sqrt(np.sum(si**2))
+        if energy < min_energy:
+            min_energy = energy
+            min_gray_code = i ^ (i >> 1)
+    return min_energy, min_gray_code
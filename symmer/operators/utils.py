@@ -77,6 +77,87 @@ def numba_dot_matmal_GF2(A, B):
                              )%2, 
                       dtype = np.bool_)
 
+def pack_GF2_rows(A: np.array) -> np.array:
+    """
+    Pack the rows of a boolean matrix into 64-bit words, zero padded.
+
+    Args:
+        A (np.array): numpy boolean array
+    Returns:
+        packed (np.array): uint64 array of shape (A.shape[0], ceil(A.shape[1]/64))
+    """
+    packed = np.packbits(A, axis=1, bitorder='little')
+    n_bytes = -(-packed.shape[1] // 8) * 8
+    packed = np.pad(packed, ((0, 0), (0, n_bytes - packed.shape[1])))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+def matmul_GF2_rows(A: np.array, B: np.array) -> np.array:
+    """
+    Matrix multiplication mod2 against the rows of B, i.e. (A@B.T)%2.
+
+    Rows are packed into 64-bit words so each inner product is a few AND/XOR
+    operations followed by a parity fold, rather than a float matmul.
+
+    Args:
+        A (np.array): boolean numpy array
+        B (np.array): boolean numpy array with the same number of columns as A
+    Returns:
+        matrix multiplication mod 2
+    """
+    return numba_packed_matmul_GF2(pack_GF2_rows(A), pack_GF2_rows(B))
+
+@nb.njit(cache=True)
+def numba_packed_matmul_GF2(A, B):
+    """
+    (A@B.T)%2 for uint64 bit-packed rows; only the parity of each AND is needed,
+    so the words are XOR-accumulated and folded down to a single bit.
+
+    Args:
+        A (np.array): uint64 packed numpy array
+        B (np.array): uint64 packed numpy array
+    Returns:
+        C (np.array): numpy boolean array of (A@B.T) mod 2
+    """
+    C = np.empty((A.shape[0], B.shape[0]), dtype=np.bool_)
+    for i in range(A.shape[0]):
+        for j in range(B.shape[0]):
+            acc = np.uint64(0)
+            for w in range(A.shape[1]):
+                acc ^= A[i, w] & B[j, w]
+            for shift in (32, 16, 8, 4, 2, 1):
+                acc ^= acc >> np.uint64(shift)
+            C[i, j] = acc & np.uint64(1)
+    return C
+
+def pack_symplectic(symp_matrix: np.array) -> np.array:
+    """
+    Pack the X and Z blocks of a symplectic matrix separately into 64-bit words.
+
+    Args:
+        symp_matrix (np.array): boolean symplectic matrix (X | Z)
+    Returns:
+        packed (np.array): uint64 array with rows of the form (X words | Z words)
+    """
+    X_block, Z_block = np.split(symp_matrix, 2, axis=1)
+    return np.hstack([pack_GF2_rows(X_block), pack_GF2_rows(Z_block)])
+
+def unpack_symplectic(packed: np.array, n_qubits: int) -> np.array:
+    """
+    Inverse of pack_symplectic.
+
+    Args:
+        packed (np.array): uint64 array with rows of the form (X words | Z words)
+        n_qubits (int): number of qubits
+    Returns:
+        symp_matrix (np.array): boolean symplectic matrix (X | Z)
+    """
+    X_words, Z_words = np.split(packed, 2, axis=1)
+    return np.hstack([
+        np.unpackbits(
+            np.ascontiguousarray(words).view(np.uint8), axis=1, count=n_qubits, bitorder='little'
+        ).astype(bool) for words in (X_words, Z_words)
+    ])
+
 def symplectic_to_string(symp_vec) -> str:
     """
     Returns string form of symplectic vector defined as (X | Z)
@@ -437,6 +518,9 @@ def mul_symplectic(
 
     P1 * P2 is performed
 
+    2D symplectic matrices of equal shape are also accepted, in which case the
+    multiplication is performed row-wise and the coefficients should be vectors.
+
     Args:
         symp_vec1 (np.array) : 1D vector of left Pauli operator
         coeff1 (float): coefficient of left  Pauli operator
@@ -448,27 +532,98 @@ def mul_symplectic(
         output_symplectic_vec (np.array): binary symplectic output (Pauli opertor out)
         coeff_vec (complex): complex coeff with correct phase
     """
-    X_block1, Z_block1 = np.split(symp_vec1, 2)
-    X_block2, Z_block2 = np.split(symp_vec2, 2)
+    X_block1, Z_block1 = np.split(symp_vec1, 2, axis=-1)
+    X_block2, Z_block2 = np.split(symp_vec2, 2, axis=-1)
 
     # number of Y terms in left Pauli operator
-    Y_count1 = np.sum(np.bitwise_and(X_block1, Z_block1), axis=0)
+    Y_count1 = np.sum(np.bitwise_and(X_block1, Z_block1), axis=-1)
     # number of Y terms in right Pauli operator
-    Y_count2 = np.sum(np.bitwise_and(X_block2, Z_block2), axis=0)
+    Y_count2 = np.sum(np.bitwise_and(X_block2, Z_block2), axis=-1)
 
     # phaseless multiplication is binary addition in symplectic representation
     output_symplectic_vec = np.bitwise_xor(symp_vec1, symp_vec2)
     # phase is determined by Y counts plus additional sign flip
-    Y_count_out = np.sum(np.bitwise_and(*np.split(output_symplectic_vec, 2)), axis=0) # number of Y terms in output
+    Y_count_out = np.sum(np.bitwise_and(*np.split(output_symplectic_vec, 2, axis=-1)), axis=-1) # number of Y terms in output
     # X_block of first op and Z_block of second op
     sign_change = (-1) ** (
-            np.sum(np.bitwise_and(X_block1, Z_block2), axis=0) % 2
+            np.sum(np.bitwise_and(X_block1, Z_block2), axis=-1) % 2
     )  # mod 2 as only care about parity
     # final phase modification
     phase_mod = sign_change * (1j) ** ((3 * (Y_count1 + Y_count2) + Y_count_out) % 4)  # mod 4 as roots of unity
     coeff_vec = phase_mod * coeff1 * coeff2
     return output_symplectic_vec, coeff_vec #, Y_count_out
 
+def expval_symplectic(
+        state_matrix: np.array, 
+        state_coeffs: np.array, 
+        symp_matrix: np.array, 
+        coeff_vec: np.array) -> complex:
+    """ 
+    Expectation value <psi|H|psi> evaluated directly from the binary representation of 
+    the state and symplectic representation of the operator, without forming the
+    intermediate operator-state products. Each Pauli term P = i^{#Y} X^x Z^z maps a basis 
+    state |b> to i^{#Y} (-1)^{b.z} |b+x>, so the bitstrings are packed into integers and 
+    each overlap <psi|P|psi> is accumulated by a binary search over the sorted basis states.
+
+    Only valid for fewer than 64 qubits.
+
+    Args:
+        state_matrix (np.array): binary matrix of basis states in psi
+        state_coeffs (np.array): coefficients of psi
+        symp_matrix (np.array): symplectic matrix of H
+        coeff_vec (np.array): coefficients of H
+
+    Returns:
+        expval (complex): the expectation value <psi|H|psi>
+    """
+    n_qubits = state_matrix.shape[1]
+    assert n_qubits < 64, 'Bitstrings must fit within a 64-bit integer'
+    bit_values = np.left_shift(np.uint64(1), np.arange(n_qubits, dtype=np.uint64))
+    pack = lambda bin_arr: bin_arr.astype(np.uint64) @ bit_values
+    # combine any repeated basis states, which also sorts the bitstrings for the search
+    state_ints, inverse = np.unique(pack(state_matrix), return_inverse=True)
+    coeffs = np.zeros(state_ints.shape[0], dtype=complex)
+    np.add.at(coeffs, inverse.reshape(-1), state_coeffs)
+    return _numba_expval_symplectic(
+        state_ints, coeffs, 
+        pack(symp_matrix[:,:n_qubits]), pack(symp_matrix[:,n_qubits:]),
+        np.asarray(coeff_vec, dtype=complex)
+    )
+
+@nb.njit(fastmath=True, cache=True)
+def _numba_expval_symplectic(state_ints, state_coeffs, X_ints, Z_ints, coeff_vec):
+    """
+    Kernel for expval_symplectic; state_ints must be sorted and unique. This is kept serial
+    since it is itself called from within the ray/multiprocessing workers of ProcessHandler.
+    """
+    phases = np.array([1, 1j, -1, -1j])
+    one = np.uint64(1)
+    term_expvals = np.zeros(coeff_vec.shape[0], dtype=np.complex128)
+    for t in range(coeff_vec.shape[0]):
+        overlap = 0j
+        for j in range(state_ints.shape[0]):
+            target = state_ints[j] ^ X_ints[t]
+            k = np.searchsorted(state_ints, target)
+            if k < state_ints.shape[0] and state_ints[k] == target:
+                # parity of the Z support on the basis state determines the sign
+                parity = 0
+                v = state_ints[j] & Z_ints[t]
+                while v:
+                    v &= v - one
+                    parity ^= 1
+                amplitude = np.conj(state_coeffs[k]) * state_coeffs[j]
+                if parity:
+                    overlap -= amplitude
+                else:
+                    overlap += amplitude
+        Y_count = 0
+        v = X_ints[t] & Z_ints[t]
+        while v:
+            v &= v - one
+            Y_count += 1
+        term_expvals[t] = coeff_vec[t] * phases[Y_count % 4] * overlap
+    return np.sum(term_expvals)
+
 def unit_n_sphere_cartesian_coords(angles: np.array) -> np.array:
     """ 
     Input an array of angles of length n, returns the n+1 cartesian coordinates 
@@ -575,19 +730,98 @@ def check_adjmat_noncontextual(adjmat) -> bool:
     Returns:
         Returns True, if input matrix has a noncontextual structure.
     """
-    # mask the terms that do not commute universally amongst the operator
-    mask_non_universal = np.where(~np.all(adjmat, axis=1))[0]
-    # look only at the unique rows in the masked adjacency matrix -
-    # identical rows correspond with operators of the same clique
-    unique_commutation_character = np.unique(
-        adjmat[mask_non_universal,:][:,mask_non_universal],
-        axis=0
-    )
-    # if the unique commutation characteristics are disjoint, i.e. no overlapping ones 
-    # between rows, the operator is noncontextual - hence we sum over rows and check
-    # the resulting vector consists of all ones.
-    return np.all(np.count_nonzero(unique_commutation_character, axis=0)==1)
+    return _check_adjmat_noncontextual(np.asarray(adjmat, dtype=np.bool_))
+
+
+@nb.njit(cache=True)
+def _check_adjmat_noncontextual(adjmat):
+    """
+    Compiled kernel for check_adjmat_noncontextual. Amongst the terms that do not commute universally,
+    the operator is noncontextual when rows of the adjacency matrix are either identical (terms of the
+    same clique) or disjoint. As the commutation relation is symmetric and reflexive, it suffices to
+    compare each row with that of the first term it commutes with, in O(m^2) rather than sorting rows.
+    """
+    n_terms = adjmat.shape[0]
+    non_universal = np.empty(n_terms, dtype=np.int64)
+    n_non_universal = 0
+    for i in range(n_terms):
+        for j in range(n_terms):
+            if not adjmat[i, j]:
+                non_universal[n_non_universal] = i
+                n_non_universal += 1
+                break
+    non_universal = non_universal[:n_non_universal]
+
+    for i in non_universal:
+        head = -1
+        for k in non_universal:
+            if adjmat[i, k]:
+                head = k
+                break
+        if head == -1:
+            # a term that does not commute with itself is not a commutation relation
+            return False
+        if head != i:
+            for k in non_universal:
+                if adjmat[i, k] != adjmat[head, k]:
+                    return False
+    return True
+
+
+def _extend_noncontextual_cliques(adjmat, clique_labels, clique_reps):
+    """
+    Incremental form of check_adjmat_noncontextual: given the clique structure of a noncontextual
+    adjacency matrix, decide whether appending one further term (the last row/column of adjmat)
+    preserves noncontextuality, without re-examining the pairs that are already known to be consistent.
+
+    The noncontextual structure is that of universally commuting terms plus cliques whose members
+    commute with one another and anticommute with every member of other cliques. Only the new term and
+    the previously universal terms that it anticommutes with acquire a clique, so only their rows, and
+    the columns they contribute to existing cliques, need checking.
+
+    Args:
+        adjmat: Boolean square matrix whose leading block is noncontextual, extended by one row/column.
+        clique_labels (np.array): clique index of each term in the leading block, -1 for universal terms.
+        clique_reps (List[int]): index of a representative term for each clique.
 
+    Returns:
+        The extended (clique_labels, clique_reps) if the matrix remains noncontextual, else None.
+    """
+    new_index = adjmat.shape[0]-1
+    commutes = adjmat[new_index, :new_index]
+    if np.all(commutes):
+        return np.append(clique_labels, -1), clique_reps
+
+    universal = clique_labels == -1
+    new_members = np.append(np.where(universal & ~commutes)[0], new_index)
+    old_members = np.where(~universal)[0]
+    non_universal = np.append(old_members, new_members)
+
+    # existing clique members must agree with their representative on the newly non-universal terms
+    old_reps = np.asarray(clique_reps, dtype=int)[clique_labels[old_members]]
+    if not np.array_equal(
+            adjmat[np.ix_(old_members, new_members)], adjmat[np.ix_(old_reps, new_members)]
+        ):
+        return None
+
+    clique_labels = np.append(clique_labels, -1)
+    clique_reps = list(clique_reps)
+    for term in new_members:
+        commuting_cliques = np.where(adjmat[term, clique_reps])[0]
+        if len(commuting_cliques) > 1:
+            return None
+        elif len(commuting_cliques) == 1:
+            # joins an existing clique, so must share its representative's commutation character
+            label = commuting_cliques[0]
+            if not np.array_equal(adjmat[term, non_universal], adjmat[clique_reps[label], non_universal]):
+                return None
+            clique_labels[term] = label
+        else:
+            # anticommutes with every clique, so founds a new one
+            clique_labels[term] = len(clique_reps)
+            clique_reps.append(term)
+
+    return clique_labels, clique_reps
 
 def perform_noncontextual_sweep(operator) -> "PauliwordOp":
     """
@@ -600,18 +834,43 @@ def perform_noncontextual_sweep(operator) -> "PauliwordOp":
         List of terms maintaining noncontextuality.
     """
 
+    # work on the packed symplectic rows directly rather than on PauliwordOp slices; the accepted
+    # terms are kept in symplectic form (Z | X) so each candidate's commutation with them is a
+    # single packed GF(2) product
+    symp_packed = operator._symp_packed
+    X_words, Z_words = np.split(symp_packed, 2, axis=1)
+    omega_accepted = np.empty_like(symp_packed)
+    omega_accepted[0] = np.hstack((Z_words[0], X_words[0]))
+
     # initialize noncontextual operator with first element of input operator
-    noncon_indices = np.array([0])
-    adjmat = np.array([[True]], dtype=bool)
-    for index, term in enumerate(operator[1:]):
-        # pad the adjacency matrix term-by-term - avoids full construction each time
-        adjmat_vector = np.append(term.commutes_termwise(operator[noncon_indices]), True)
-        adjmat_padded = np.pad(adjmat, pad_width=((0, 1), (0, 1)), mode='constant')
-        adjmat_padded[-1,:] = adjmat_vector; adjmat_padded[:,-1] = adjmat_vector
-        # check whether the adjacency matrix has a noncontextual structure
-        if check_adjmat_noncontextual(adjmat_padded):
-            noncon_indices = np.append(noncon_indices, index+1)
-            adjmat = adjmat_padded
+    noncon_indices = [0]
+    # adjacency matrix of the accepted terms lives in the leading block of a buffer that
+    # grows geometrically, with the candidate term written into the next row/column
+    adjmat = np.ones((1, 1), dtype=bool)
+    n_accepted = 1
+    # a single term commutes universally
+    clique_labels, clique_reps = np.array([-1]), []
+    for index in range(1, operator.n_terms):
+        if n_accepted == adjmat.shape[0]:
+            capacity = min(2*n_accepted, operator.n_terms)
+            adjmat_grown = np.empty((capacity, capacity), dtype=bool)
+            adjmat_grown[:n_accepted, :n_accepted] = adjmat
+            adjmat = adjmat_grown
+        adjmat_vector = ~numba_packed_matmul_GF2(
+            symp_packed[index:index+1], omega_accepted[:n_accepted]
+        )[0]
+        adjmat[n_accepted, :n_accepted] = adjmat_vector
+        adjmat[:n_accepted, n_accepted] = adjmat_vector
+        adjmat[n_accepted, n_accepted] = True
+        # check whether the adjacency matrix retains a noncontextual structure
+        extended = _extend_noncontextual_cliques(
+            adjmat[:n_accepted+1, :n_accepted+1], clique_labels, clique_reps
+        )
+        if extended is not None:
+            clique_labels, clique_reps = extended
+            noncon_indices.append(index)
+            omega_accepted[n_accepted] = np.hstack((Z_words[index], X_words[index]))
+            n_accepted += 1
 
     return operator[noncon_indices] 
 
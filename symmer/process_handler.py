@@ -4,6 +4,7 @@ import numpy as np
 import quimb
 from ray import remote, put, get
 from multiprocessing import Process, Queue, set_start_method
+from concurrent.futures import ThreadPoolExecutor
 
 if sys.platform.lower() in ['linux', 'darwin']:
     set_start_method('fork', force = True)
@@ -17,6 +18,7 @@ class ProcessHandler:
 
     def __init__(self):
         self.n_logical_cores = os.cpu_count()
+        self._thread_pool = None
 
     def prepare_chunks(self, iter):
         """ split a list into smaller sized chunks
@@ -86,6 +88,21 @@ class ProcessHandler:
         data = [a for b in data for a in b]
         return data
     
+    def _process_threads(self, func, iter, shared):
+        """ Helper function for multithreading - there is no pickling of data and the 
+        thread pool is reused across calls, so this is effective when func releases the 
+        GIL, e.g. numpy/scipy linear algebra
+        """
+        if self.verbose:
+            print(f'*** executing in multithreaded mode ***')
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.n_logical_cores)
+        results = self._thread_pool.map(
+            lambda chunk: func(chunk, shared), self.prepare_chunks(iter)
+        )
+        # flatten the list and return:
+        return [a for b in results for a in b]
+    
     def _process_single(self, func, iter, shared):
         """ Helper function for single threading
         """
@@ -103,10 +120,12 @@ class ProcessHandler:
                 return self._process_mp(_func, iter, shared)
             elif self.method == 'ray':
                 return self._process_ray(_func, iter, shared)
+            elif self.method == 'threads':
+                return self._process_threads(_func, iter, shared)
             elif self.method == 'single_thread':
                 return self._process_single(_func, iter, shared)
             else:
-                raise ValueError(f'Invalid processing method {self.method}, must be ray, mp or single_thread.')
+                raise ValueError(f'Invalid processing method {self.method}, must be ray, mp, threads or single_thread.')
             
         return wrapper
     
@@ -0,0 +1,169 @@
+import pytest
+import numpy as np
+from symmer import PauliwordOp, QuantumState
+from symmer.evolution import VQE_Driver, ADAPT_VQE
+
+H = PauliwordOp.from_dictionary({
+    'IIII': -0.2, 'ZIII': 0.17, 'IZII': 0.17, 'IIZI': -0.22, 'IIIZ': -0.22,
+    'ZZII': 0.12, 'IIZZ': 0.17, 'XXYY': -0.05, 'YYXX': -0.05, 'XYYX': 0.05,
+    'YXXY': 0.05, 'ZIZI': 0.12, 'IZIZ': 0.12, 'XZXI': 0.03, 'IXZX': -0.07
+})
+ref_state = QuantumState([[1,1,0,0]])
+excitation_pool = PauliwordOp.from_list(
+    ['YXII', 'XYII', 'IIYX', 'IIXY', 'YZXI', 'IYZX', 'YXXX', 'XYXX', 'XXYX', 'XXXY']
+)
+
+expectation_evals = [
+    'dense_array', 'sparse_array', 'symbolic_direct', 'symbolic_projector', 'observable_rotation'
+]
+
+def exact_energy(excitation_ops, x):
+    """ Energy of the ansatz e^{iθ_N P_N}...e^{iθ_1 P_1}|ref> by dense matrix exponentials
+    """
+    from scipy.linalg import expm
+    psi = ref_state.to_sparse_matrix.toarray()
+    for P, angle in zip(excitation_ops, x):
+        psi = expm(1j*angle*P.to_sparse_matrix.toarray()) @ psi
+    return (psi.conj().T @ H.to_sparse_matrix.toarray() @ psi)[0,0].real
+
+@pytest.mark.parametrize("expectation_eval", expectation_evals)
+def test_energy_matches_exact(expectation_eval):
+    excitation_ops = excitation_pool[[0,4,6]]
+    x = np.array([0.3, -0.2, 0.7])
+    vqe = VQE_Driver(H, excitation_ops=excitation_ops, ref_state=ref_state)
+    vqe.expectation_eval = expectation_eval
+    assert np.isclose(vqe.f(x), exact_energy(excitation_ops, x))
+
+@pytest.mark.parametrize("expectation_eval", expectation_evals)
+def test_gradient_matches_finite_difference(expectation_eval):
+    excitation_ops = excitation_pool[[0,4,6,9]]
+    x = np.array([0.3, -0.2, 0.7, 1.9])
+    vqe = VQE_Driver(H, excitation_ops=excitation_ops, ref_state=ref_state)
+    vqe.expectation_eval = expectation_eval
+    eps = 1e-6
+    fd_gradient = np.array([
+        (exact_energy(excitation_ops, x + eps*e) - exact_energy(excitation_ops, x - eps*e))/(2*eps)
+        for e in np.eye(4)
+    ])
+    assert np.allclose(vqe.gradient(x), fd_gradient, atol=1e-5)
+
+def test_generator_matrices_built_on_demand():
+    excitation_ops = excitation_pool[[0,4,6]]
+    x = np.array([0.3, -0.2, 0.7])
+    vqe = VQE_Driver(H, excitation_ops=excitation_ops, ref_state=ref_state)
+    vqe.expectation_eval = 'observable_rotation'
+    vqe.gradient(x)
+    assert vqe._generator_matrices is None
+    vqe.expectation_eval = 'sparse_array'
+    vqe.gradient(x)
+    assert vqe._generator_matrices is not None
+
+def test_reassigned_circuit():
+    vqe = VQE_Driver(H, excitation_ops=excitation_pool[[0,4,6]], ref_state=ref_state)
+    vqe.expectation_eval = 'dense_array'
+    x = np.array([0.3, -0.2, 0.7])
+    vqe.f(x)
+    # replacing the circuit must not reuse the generators of the original ansatz
+    excitation_ops = excitation_pool[[1,5,7]]
+    vqe.circuit = VQE_Driver(H, excitation_ops=excitation_ops, ref_state=ref_state).circuit
+    assert np.isclose(vqe.f(x), exact_energy(excitation_ops, x))
+
+def test_run_default_init():
+    vqe = VQE_Driver(H, excitation_ops=excitation_pool[[0,4,6]], ref_state=ref_state)
+    vqe.verbose = False
+    opt_out, vqe_history = vqe.run(method='BFGS')
+    assert np.all(vqe_history['params'][0] == 0)
+    assert np.isclose(vqe_history['energy'][0], exact_energy(excitation_pool[[0,4,6]], np.zeros(3)))
+    assert opt_out['fun'] <= vqe_history['energy'][0]
+
+def test_run_gradient_free():
+    circuit = VQE_Driver(H, excitation_ops=excitation_pool[[0,4,6]], ref_state=ref_state).circuit
+    vqe = VQE_Driver(H, ansatz_circuit=circuit, ref_state=ref_state)
+    vqe.verbose = False
+    opt_out, vqe_history = vqe.run(method='Nelder-Mead', options={'maxiter':20})
+    assert opt_out['njev'] == 0
+    assert vqe_history['gradient'] == {}
+    assert len(vqe_history['energy']) == opt_out['nfev']
+
+def test_commutators():
+    adapt = ADAPT_VQE(H, excitation_pool=excitation_pool, ref_state=ref_state)
+    for P, commutator in zip(excitation_pool, adapt.commutators):
+        assert commutator == H.commutator(P)*1j
+
+def finite_difference_pool_gradient(adapt, expectation_eval, eps=1e-6):
+    """ Differentiate the energy with respect to a new parameter appended to the ansatz
+    """
+    x = np.asarray(adapt.opt_parameters)
+    gradient = []
+    for P in adapt.excitation_pool:
+        vqe = VQE_Driver(H, excitation_ops=adapt.adapt_operator.append(P), ref_state=ref_state)
+        vqe.expectation_eval = expectation_eval
+        gradient.append(
+            (vqe.f(np.append(x, eps)) - vqe.f(np.append(x, -eps)))/(2*eps)
+        )
+    return np.asarray(gradient)
+
+@pytest.mark.parametrize("expectation_eval", expectation_evals)
+def test_pool_gradient_param_shift(expectation_eval):
+    adapt = ADAPT_VQE(H, excitation_pool=excitation_pool, ref_state=ref_state)
+    adapt.expectation_eval = expectation_eval
+    adapt.derivative_eval = 'param_shift'
+    adapt.append_to_adapt_operator([excitation_pool[0], excitation_pool[6]])
+    adapt.prepare_for_evolution(adapt.adapt_operator)
+    adapt.opt_parameters = np.array([0.3, -0.4])
+    assert np.allclose(
+        adapt.pool_gradient(), 
+        finite_difference_pool_gradient(adapt, expectation_eval), 
+        atol=1e-5
+    )
+
+@pytest.mark.parametrize("expectation_eval", expectation_evals)
+def test_param_shift_matches_commutators(expectation_eval):
+    adapt = ADAPT_VQE(H, excitation_pool=excitation_pool, ref_state=ref_state)
+    adapt.expectation_eval = expectation_eval
+    adapt.append_to_adapt_operator([excitation_pool[2], excitation_pool[5]])
+    adapt.prepare_for_evolution(adapt.adapt_operator)
+    adapt.opt_parameters = np.array([-0.6, 0.25])
+    adapt.pool_gradient()
+    for index in range(excitation_pool.n_terms):
+        assert np.isclose(
+            adapt._derivative_from_param_shift(index), 
+            adapt._derivative_from_commutators(index)
+        )
+
+def test_TETRIS_selects_disjoint_supports():
+    observable = PauliwordOp.from_dictionary({'XIII': 1, 'IIXI': 0.9, 'IXIX': 0.5, 'ZZZZ': 0.1})
+    pool = PauliwordOp.from_list(['YIYI', 'YIII', 'IIYI', 'IYIY', 'IYII'])
+    adapt = ADAPT_VQE(observable, excitation_pool=pool, ref_state=QuantumState([[0,0,0,0]]))
+    adapt.expectation_eval = 'dense_array'
+    adapt.topology_aware = False
+    adapt.TETRIS = True
+    adapt.verbose = False
+    out = adapt.optimize(max_cycles=1)
+    excitations = PauliwordOp.from_list(out['interim_data'][1]['excitation'])
+    supports = excitations.X_block | excitations.Z_block
+    assert excitations.n_terms > 1
+    assert np.all(np.sum(supports, axis=0) <= 1)
+
+@pytest.mark.parametrize("method", ['single_thread', 'threads'])
+def test_gradient_processing_methods(method):
+    from symmer import process
+    excitation_ops = excitation_pool[[0,4,6]]
+    x = np.array([0.3, -0.2, 0.7])
+    # a bare circuit ansatz is differentiated by the parameter shift rule
+    circuit = VQE_Driver(H, excitation_ops=excitation_ops, ref_state=ref_state).circuit
+    vqe = VQE_Driver(H, ansatz_circuit=circuit, ref_state=ref_state)
+    vqe.expectation_eval = 'sparse_array'
+    vqe.serial_qubit_threshold = 0 # force the parallelized branch
+    default_method = process.method
+    process.method = method
+    try:
+        gradient = vqe.gradient(x)
+    finally:
+        process.method = default_method
+    eps = 1e-6
+    fd_gradient = np.array([
+        (exact_energy(excitation_ops, x + eps*e) - exact_energy(excitation_ops, x - eps*e))/(2*eps)
+        for e in np.eye(3)
+    ])
+    assert np.allclose(gradient, fd_gradient, atol=1e-5)
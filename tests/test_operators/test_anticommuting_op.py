@@ -1,4 +1,5 @@
 from symmer.operators import AntiCommutingOp, PauliwordOp
+from symmer.operators.anticommuting_op import conjugate_Pop_with_R
 import pytest
 import numpy as np
 
@@ -39,6 +40,15 @@ def test_init_not_anticommuting():
                                          'III':1})
 
 
+def test_init_skip_validation():
+    """
+    check no assert error is thrown when validation is switched off
+    """
+    op = PauliwordOp.from_dictionary({'ZZZ':1, 'ZIZ':1})
+    AC_op = AntiCommutingOp.from_PauliwordOp(op, validate=False)
+    assert AC_op == op
+
+
 def test_init_commuting():
     """
     check assert error thrown if input is not anticommuting
@@ -217,4 +227,46 @@ def test_ac_set_with_negative_and_zero_ceoffs():
     LCU_output = AC_normed.perform_rotations(rotations_LCU)
     assert LCU_output.n_terms==1
     assert np.isclose(LCU_output.coeff_vec[0], -1)
-    assert Ps_LCU == LCU_output
\ No newline at end of file
+    assert Ps_LCU == LCU_output
+
+
+@pytest.mark.parametrize("R_n_terms", [1, 2, 3, 7])
+def test_conjugate_Pop_with_R(R_n_terms):
+    Pop = PauliwordOp.random(4, 30)
+    R = PauliwordOp.random(4, R_n_terms)
+    R_Pop_Rdag = (R * Pop * R.dagger).cleanup()
+    assert conjugate_Pop_with_R(Pop, R) == R_Pop_Rdag
+    assert Pop.conjugate_op(R) == R_Pop_Rdag
+
+
+def test_conjugate_Pop_with_R_LCU():
+    AcOp_real = AntiCommutingOp.from_dictionary(anti_commuting_real)
+    Ps_LCU, rotations_LCU, gamma_l, AC_normed = AcOp_real.unitary_partitioning(s_index=0, up_method='LCU')
+    assert conjugate_Pop_with_R(AC_normed, AcOp_real.R_LCU) == Ps_LCU
+
+
+def test_conjugate_Pop_with_R_precomputed_commutation():
+    AcOp_real = AntiCommutingOp.from_dictionary(anti_commuting_real)
+    Pop = PauliwordOp.random(AcOp_real.n_qubits, 10)
+    R_Pop_Rdag = conjugate_Pop_with_R(Pop, AcOp_real)
+    assert conjugate_Pop_with_R(Pop, AcOp_real, Pop.commutes_termwise(AcOp_real)) == R_Pop_Rdag
+    assert R_Pop_Rdag == (AcOp_real * Pop * AcOp_real.dagger).cleanup()
+    # validating the operator must not corrupt its cached adjacency matrix
+    assert np.all(np.diag(AcOp_real.adjacency_matrix))
+
+
+def test_conjugate_Pop_with_R_unvalidated_commuting():
+    # an unvalidated AntiCommutingOp may contain commuting terms, which must be respected
+    R = AntiCommutingOp.from_PauliwordOp(PauliwordOp.from_dictionary({'ZZZ':0.6, 'ZIZ':0.8}), validate=False)
+    Pop = PauliwordOp.random(R.n_qubits, 10)
+    R_Pop_Rdag = conjugate_Pop_with_R(Pop, R)
+    assert R_Pop_Rdag == (R * Pop * R.dagger).cleanup()
+
+
+def test_recursive_seq_rotations_zero_Ps_coeff():
+    # rotating onto a term with zero coefficient must not divide by zero
+    AcOp = AntiCommutingOp.from_list(['ZI', 'XI', 'YX'], [0, 0.6, 0.8])
+    Ps = AcOp._recursive_seq_rotations(AcOp)
+    rotated = AcOp.perform_rotations(AcOp.X_sk_rotations)
+    assert rotated.n_terms == 1
+    assert rotated == Ps
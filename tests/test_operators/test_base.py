@@ -740,6 +740,20 @@ def test_to_sparse_matrix_large_operator():
     assert H == out, 'to_sparse_matrix of large Pauli operator is failing'
 
 
+@pytest.mark.parametrize("angle", [np.pi/2, -np.pi/2, np.pi, -np.pi, 3*np.pi/2, -3*np.pi/2, 0.3])
+def test_perform_rotations_matches_matrix(angle):
+    """ Clifford rotations through negative multiples of pi/2 must pick up the correct sign
+    """
+    from scipy.linalg import expm
+    H = PauliwordOp.random(3, 10)
+    P = PauliwordOp.random(3, 1)
+    P.coeff_vec[0] = 1
+    R = expm(1j*angle/2*P.to_sparse_matrix.toarray())
+    assert np.allclose(
+        H.perform_rotations([(P, angle)]).to_sparse_matrix.toarray(),
+        R @ H.to_sparse_matrix.toarray() @ R.conj().T
+    )
+
 def test_QuantumState_overlap():
     for n_q in range(2,5):
         random_ket_1 = QuantumState.haar_random(n_q, vec_type='ket')
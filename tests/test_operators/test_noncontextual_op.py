@@ -1,11 +1,18 @@
+import os
+import json
 import warnings
+import itertools
 
 import pytest
 import numpy as np
 from symmer.operators import PauliwordOp, NoncontextualOp, QuantumState
 from symmer.operators.noncontextual_op import NoncontextualSolver
+from symmer import process
 from symmer.utils import exact_gs_energy
 
+test_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ham_data_dir = os.path.join(test_dir, 'hamiltonian_data')
+
 def jordan_generator_reconstruction_check(self, generators):
     """ Function for jordan generators reconstruction test
     This builds the noncontextual operator under the Jordan product, but does not give the
@@ -155,6 +162,20 @@ def test_from_hamiltonian_DFS_largest():
     assert H_noncon_dfs.is_noncontextual
 
 
+@pytest.mark.parametrize("method", ['single_thread', 'threads', 'mp'])
+@pytest.mark.parametrize("strategy", ['DFS_magnitude', 'DFS_largest'])
+def test_from_hamiltonian_DFS_parallel_matches_serial(monkeypatch, method, strategy):
+    """
+    check the parallel depth first search explores the same starting terms as the serial one
+    """
+    H = PauliwordOp.from_dictionary(H_con_dict)
+    H_noncon_serial = NoncontextualOp.from_hamiltonian(H, strategy=strategy, DFS_runtime=100)
+    monkeypatch.setattr(NoncontextualOp, 'dfs_parallel_min_terms', 1)
+    monkeypatch.setattr(process, 'method', method)
+    H_noncon_parallel = NoncontextualOp.from_hamiltonian(H, strategy=strategy, DFS_runtime=100)
+    assert H_noncon_parallel == H_noncon_serial
+
+
 def test_from_hamiltonian_SingleSweep_magnitude():
     """
     check noncontextual op via depth first search
@@ -269,6 +290,18 @@ def test_solve_brute_force_discrete_no_ref():
     assert np.isclose(H_noncon.energy, noncon_problem['E'])
 
 
+@pytest.mark.parametrize("n_cliques", [0, 3, 4])
+def test_brute_force_matches_exhaustive_search(n_cliques):
+    H_noncon = NoncontextualOp.random(7, n_cliques=n_cliques, n_commuting_terms=16)
+    n_gen = H_noncon.symmetry_generators.n_terms
+    exhaustive_energy = min(
+        H_noncon.get_energy(np.array(nu)) for nu in itertools.product([-1, 1], repeat=n_gen)
+    )
+    energy, nu = NoncontextualSolver(H_noncon).energy_via_brute_force()
+    assert np.isclose(energy, exhaustive_energy)
+    assert np.isclose(H_noncon.get_energy(nu), energy)
+
+
 def test_solve_binary_relaxation_no_ref():
     H_noncon = NoncontextualOp.from_dictionary(noncon_problem['H_dict'])
     
@@ -280,6 +313,22 @@ def test_solve_binary_relaxation_no_ref():
     else:
         assert np.isclose(H_noncon.energy, noncon_problem['E'])
 
+@pytest.mark.parametrize("filename", [
+    'Be_STO-3G_SINGLET_BK.json', 'BH_STO-3G_SINGLET_JW.json', 'BH_STO-3G_SINGLET_BK.json',
+    'BeH2_STO-3G_SINGLET_BK.json', 'H2O_STO-3G_SINGLET_JW.json'
+])
+def test_relaxation_matches_brute_force(filename):
+    with open(os.path.join(ham_data_dir, filename), 'r') as f:
+        H_data = json.load(f)
+    H = PauliwordOp.from_dictionary(H_data['hamiltonian'])
+    H_noncon = NoncontextualOp.from_hamiltonian(H, strategy='SingleSweep_magnitude')
+    brute_force_energy, _ = NoncontextualSolver(H_noncon).energy_via_brute_force()
+    relaxation_energy, nu = NoncontextualSolver(H_noncon).energy_via_relaxation()
+    assert np.isclose(relaxation_energy, brute_force_energy)
+    assert np.isclose(H_noncon.get_energy(nu), relaxation_energy)
+    # the starting points are seeded, so repeated calls agree
+    assert np.all(NoncontextualSolver(H_noncon).energy_via_relaxation()[1] == nu)
+
 def test_solve_full_reference_state():
     H_noncon = NoncontextualOp.from_dictionary(noncon_problem['H_dict'])
     reference = noncon_problem['reference_state']
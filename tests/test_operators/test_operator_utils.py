@@ -1,5 +1,9 @@
-from symmer.operators.utils import check_jordan_independent
-from symmer.operators import PauliwordOp
+import numpy as np
+from symmer.operators.utils import (
+    check_jordan_independent, mul_symplectic, expval_symplectic, matmul_GF2, matmul_GF2_rows,
+    check_adjmat_noncontextual, _extend_noncontextual_cliques
+)
+from symmer.operators import PauliwordOp, QuantumState
 
 def test_check_jordan_independent_not_indp():
     """
@@ -71,4 +75,79 @@ def test_check_jordan_independent():
                                       'IIZIIIXY': (1+0j)})
     
     j_ind_flag = check_jordan_independent(op)
-    assert j_ind_flag
\ No newline at end of file
+    assert j_ind_flag
+
+
+def test_mul_symplectic_rowwise():
+    """
+    row-wise multiplication of symplectic matrices should match multiplying term-by-term
+    """
+    P1 = PauliwordOp.random(4, 20)
+    P2 = PauliwordOp.random(4, 20)
+    symp_out, coeff_out = mul_symplectic(P1.symp_matrix, P1.coeff_vec, P2.symp_matrix, P2.coeff_vec)
+    for i in range(20):
+        assert PauliwordOp(symp_out[i], [coeff_out[i]]) == P1[i] * P2[i]
+
+
+def test_expval_symplectic():
+    """
+    direct expectation value evaluation should match the symbolic sandwich product
+    """
+    H = PauliwordOp.random(5, 30)
+    psi = QuantumState.haar_random(5)
+    expval = expval_symplectic(psi.state_matrix, psi.state_op.coeff_vec, H.symp_matrix, H.coeff_vec)
+    assert np.isclose(expval, psi.dagger * H * psi)
+
+
+def test_expval_symplectic_duplicate_basis_states():
+    """
+    repeated basis states in the state should be combined
+    """
+    H = PauliwordOp.random(3, 20)
+    psi = QuantumState([[1,0,1],[1,0,1],[0,1,1]], [0.3, 0.2j, 0.5])
+    expval = expval_symplectic(psi.state_matrix, psi.state_op.coeff_vec, H.symp_matrix, H.coeff_vec)
+    assert np.isclose(expval, psi.dagger * H * psi)
+
+
+def test_expval_symplectic_no_terms():
+    """
+    an operator with no terms has zero expectation value
+    """
+    psi = QuantumState.haar_random(3)
+    expval = expval_symplectic(psi.state_matrix, psi.state_op.coeff_vec, np.zeros((0,6), dtype=bool), np.zeros(0))
+    assert expval == 0
+
+
+def test_matmul_GF2_rows():
+    # widths either side of the 64-bit word boundary
+    for n_cols in [1, 7, 63, 64, 65, 200]:
+        A = np.random.random((5, n_cols)) < 0.5
+        B = np.random.random((8, n_cols)) < 0.5
+        assert np.all(matmul_GF2_rows(A, B) == matmul_GF2(A, B.T))
+
+
+def test_extend_noncontextual_cliques():
+    # sweeping random adjacency matrices term by term must agree with the full check
+    for _ in range(200):
+        n_terms = np.random.randint(2, 12)
+        adjmat = np.triu(np.random.random((n_terms, n_terms)) < np.random.random(), 1)
+        adjmat = adjmat | adjmat.T | np.eye(n_terms, dtype=bool)
+        accepted, clique_labels, clique_reps = [0], np.array([-1]), []
+        for index in range(1, n_terms):
+            trial = accepted + [index]
+            extended = _extend_noncontextual_cliques(adjmat[np.ix_(trial, trial)], clique_labels, clique_reps)
+            assert (extended is not None) == check_adjmat_noncontextual(adjmat[np.ix_(trial, trial)])
+            if extended is not None:
+                accepted, (clique_labels, clique_reps) = trial, extended
+
+
+def test_check_adjmat_noncontextual_matches_unique_rows():
+    # noncontextual iff the non-universal rows are pairwise identical or disjoint
+    for _ in range(500):
+        n_terms = np.random.randint(1, 12)
+        adjmat = np.triu(np.random.random((n_terms, n_terms)) < np.random.random(), 1)
+        adjmat = adjmat | adjmat.T | np.eye(n_terms, dtype=bool)
+        mask_non_universal = np.where(~np.all(adjmat, axis=1))[0]
+        unique_rows = np.unique(adjmat[np.ix_(mask_non_universal, mask_non_universal)], axis=0)
+        expected = np.all(np.count_nonzero(unique_rows, axis=0)==1)
+        assert check_adjmat_noncontextual(adjmat) == expected